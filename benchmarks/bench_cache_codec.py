@@ -0,0 +1,87 @@
+"""
+Benchmark cache payload encode/decode time and size: pickle of ORM objects against CacheCodec records
+Nested menu: 10 menus x 10 submenus x 100 dishes = 10k dishes, no database needed
+Run from project root:
+    PYTHONPATH=src python benchmarks/bench_cache_codec.py
+"""
+import argparse
+import asyncio
+import pickle
+import time
+from typing import Any, Callable
+from uuid import uuid4
+
+from db.cache_codec import CacheCodec, zstandard
+from menu_app.models import Dish, Menu, Submenu
+from menu_app.schemas import MenuReadNested
+from menu_app.utils import MenuConverter
+
+
+def build_menus(menus: int, submenus: int, dishes: int) -> list[Menu]:
+    """Build nested ORM objects in memory"""
+    return [
+        Menu(
+            id=uuid4(), title=f'Menu {menu}', description='Menu description',
+            submenus=[
+                Submenu(
+                    id=uuid4(), title=f'Submenu {menu}.{submenu}', description='Submenu description',
+                    dish=[
+                        Dish(
+                            id=uuid4(), title=f'Dish {menu}.{submenu}.{dish}',
+                            description='Dish description', price='123.45',
+                            discount='0%', discounted_price='123.45'
+                        )
+                        for dish in range(dishes)
+                    ]
+                )
+                for submenu in range(submenus)
+            ]
+        )
+        for menu in range(menus)
+    ]
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """Return best time of func call in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(menus: int, submenus: int, dishes: int, repeat: int) -> None:
+    """Compare pickle and codec paths"""
+    orm_menus = build_menus(menus, submenus, dishes)
+    schema_menus = asyncio.run(MenuConverter.convert_menus_sequence_to_list_nested(orm_menus))
+
+    pickle_payload = pickle.dumps(orm_menus)
+    rows = [('pickle ORM', len(pickle_payload),
+             measure(lambda: pickle.dumps(orm_menus), repeat),
+             measure(lambda: pickle.loads(pickle_payload), repeat))]
+
+    compressions = ['none', 'zlib'] + (['zstd'] if zstandard is not None else [])
+    for compression in compressions:
+        codec = CacheCodec(compression=compression)
+        payload = codec.encode(schema_menus)
+        rows.append((
+            f'codec {compression}', len(payload),
+            measure(lambda: codec.encode(schema_menus), repeat),
+            measure(lambda: [MenuReadNested.model_validate(menu) for menu in codec.decode(payload)], repeat),
+        ))
+
+    print(f'{menus * submenus * dishes} dishes')
+    print(f'{"path":<14}{"size, KB":>12}{"encode, ms":>12}{"decode, ms":>12}')
+    for title, size, encode_time, decode_time in rows:
+        print(f'{title:<14}{size / 1024:>12.1f}{encode_time:>12.2f}{decode_time:>12.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--menus', type=int, default=10)
+    parser.add_argument('--submenus', type=int, default=10)
+    parser.add_argument('--dishes', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    main(args.menus, args.submenus, args.dishes, args.repeat)
@@ -0,0 +1,35 @@
+"""
+Benchmark sync pricing pass with discount index on growing catalog
+Time per dish should stay flat when catalog grows, no database needed
+Run from project root:
+    PYTHONPATH=src python benchmarks/bench_discount_index.py
+"""
+import argparse
+import asyncio
+import time
+
+from menu_app.utils import DishConverter
+
+
+async def main(sizes: list[int], repeat: int) -> None:
+    """Run benchmark for every catalog size"""
+    for dishes in sizes:
+        titles = [f'Dish {dish}' for dish in range(dishes)]
+        discount_index = await DishConverter.build_discount_index([
+            {'title': title, 'discount': '15'} for title in titles
+        ])
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for title in titles:
+                await DishConverter.return_dish_pricing(title, '123.45', discount_index)
+            best = min(best, time.perf_counter() - start)
+        print(f'{dishes:8} dishes {best * 1000:10.1f} ms {best / dishes * 1e6:8.2f} us/dish')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 2000, 4000, 8000, 16000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.repeat))
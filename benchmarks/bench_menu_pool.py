@@ -0,0 +1,123 @@
+"""
+Benchmark GET /api/v1/menus/{menu_id} requests/sec with pooled engine and NullPool engine
+Cache is disabled so every request goes to database
+Needs database from .env, run from project root:
+    PYTHONPATH=src python benchmarks/bench_menu_pool.py --requests 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Sequence
+
+from httpx import AsyncClient
+from pydantic import BaseModel
+from sqlalchemy import delete, insert
+from starlette.responses import Response
+
+from db import database
+from db.cache_repo import CacheRepository, render_response
+from main import app
+from menu_app.menu.menu_router import get_menu
+from menu_app.models import Base, Menu
+
+
+class NoCacheRepository(CacheRepository):
+    """Cache repository which always miss and never touches redis"""
+
+    def __init__(self) -> None:
+        self.redis_session = None
+
+    async def get(self, key: str, schema: type[BaseModel] | None = None, raw: bool = False) -> None:
+        """Always return cache miss"""
+        return None
+
+    async def get_or_set(
+            self,
+            key: str,
+            loader: Callable[[], Awaitable[Any]],
+            schema: type[BaseModel] | None = None,
+            raw: bool = False,
+            ttl: int | None = None,
+    ) -> Any:
+        """Always load value"""
+        return await loader()
+
+    async def get_or_set_response(
+            self,
+            key: str,
+            loader: Callable[[], Awaitable[Any]],
+            response_model: Any,
+            version_scope: str | None = None,
+            if_none_match: str | None = None,
+    ) -> Response:
+        """Always load and render response, without ETag"""
+        return Response(content=await render_response(loader, response_model), media_type='application/json')
+
+    async def _get_payloads(self, keys: list[str]) -> list[bytes | None]:
+        """Always return cache miss"""
+        return [None] * len(keys)
+
+    async def _load_parts(
+            self,
+            part_keys: dict[str, str],
+            parts_loader: Callable[[list[str]], Awaitable[dict[str, bytes]]],
+    ) -> dict[str, bytes]:
+        """Always load parts"""
+        return await parts_loader(list(part_keys))
+
+    async def get_versions(self, scopes: Sequence[str]) -> list[int]:
+        """Versions are not stored"""
+        return [0] * len(scopes)
+
+    async def bump_versions(self, scopes: Sequence[str]) -> None:
+        """Versions are not stored"""
+        return None
+
+
+async def run_mode(use_null_pool: bool, requests: int, concurrency: int) -> float:
+    """Return requests/sec for engine mode"""
+    await database.dispose_engine()
+    session_maker = database.get_session_maker(use_null_pool=use_null_pool)
+    async with database.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_maker() as session:
+        menu_id = (await session.execute(
+            insert(Menu).values(title='bench', description='bench').returning(Menu.id)
+        )).scalar_one()
+        await session.commit()
+
+    semaphore = asyncio.Semaphore(concurrency)
+    url = app.url_path_for(get_menu.__name__, menu_id=menu_id)
+
+    async with AsyncClient(app=app, base_url='http://bench') as client:
+        async def send() -> None:
+            async with semaphore:
+                response = await client.get(url)
+                response.raise_for_status()
+
+        await send()
+        start = time.perf_counter()
+        await asyncio.gather(*(send() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    async with session_maker() as session:
+        await session.execute(delete(Menu).where(Menu.id == menu_id))
+        await session.commit()
+    await database.dispose_engine()
+    return requests / elapsed
+
+
+async def main(requests: int, concurrency: int) -> None:
+    """Run benchmark for both engine modes"""
+    app.dependency_overrides[CacheRepository] = NoCacheRepository
+    for title, use_null_pool in (('QueuePool', False), ('NullPool', True)):
+        rps = await run_mode(use_null_pool, requests, concurrency)
+        print(f'{title:<10} {rps:10.1f} requests/sec')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
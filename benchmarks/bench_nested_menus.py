@@ -0,0 +1,94 @@
+"""
+Benchmark building nested menus json with ORM path and database json_agg path
+Catalog is filled with menus x submenus x dishes, every tenth dish gets discount
+Needs database from .env, run from project root:
+    PYTHONPATH=src python benchmarks/bench_nested_menus.py --menus 100 --submenus 50 --dishes 50
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+import orjson
+from sqlalchemy import delete, insert
+
+from db import database
+from menu_app.menu.menu_repo import MenuRepository
+from menu_app.models import Base, Dish, Menu, Submenu
+from menu_app.utils import DishConverter, MenuConverter
+
+
+async def fill_catalog(menus: int, submenus: int, dishes: int) -> None:
+    """Insert catalog with dish pricing"""
+    menu_rows, submenu_rows, dish_rows, discounts = [], [], [], []
+    for menu_number in range(menus):
+        menu_id = uuid4()
+        menu_rows.append({'id': menu_id, 'title': f'menu {menu_number}', 'description': 'bench'})
+        for submenu_number in range(submenus):
+            submenu_id = uuid4()
+            submenu_rows.append({
+                'id': submenu_id, 'title': f'submenu {menu_number}.{submenu_number}',
+                'description': 'bench', 'menu_id': menu_id
+            })
+            for dish_number in range(dishes):
+                title = f'dish {menu_number}.{submenu_number}.{dish_number}'
+                dish_rows.append({
+                    'id': uuid4(), 'title': title, 'description': 'bench',
+                    'price': f'{dish_number + 10}.50', 'submenu_id': submenu_id
+                })
+                discounts.append({'title': title, 'discount': '15' if dish_number % 10 == 0 else ''})
+    discount_index = await DishConverter.build_discount_index(discounts)
+    for dish in dish_rows:
+        dish.update(await DishConverter.return_dish_pricing(dish.get('title'), dish.get('price'), discount_index))
+    async with database.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for model, rows in ((Menu, menu_rows), (Submenu, submenu_rows), (Dish, dish_rows)):
+            for start in range(0, len(rows), 5000):
+                await conn.execute(insert(model), rows[start:start + 5000])
+
+
+async def orm_path(repo: MenuRepository) -> bytes:
+    """Nested menus as built by ORM path"""
+    menus = await MenuConverter.convert_menus_sequence_to_list_nested(
+        await repo.get_all_menus_with_nested_obj()
+    )
+    return orjson.dumps([menu.model_dump() for menu in menus])
+
+
+async def json_path(repo: MenuRepository) -> bytes:
+    """Nested menus as built by database, every menu is rendered by json_agg and joined in order of ids"""
+    menu_ids = await repo.get_menu_ids()
+    menus = await repo.get_menus_with_nested_json(menu_ids)
+    return b'[' + b','.join(menus[str(menu_id)] for menu_id in menu_ids) + b']'
+
+
+async def main(menus: int, submenus: int, dishes: int, repeat: int) -> None:
+    """Run benchmark for both paths"""
+    session_maker = database.get_session_maker()
+    await fill_catalog(menus, submenus, dishes)
+    print(f'catalog: {menus} menus x {submenus} submenus x {dishes} dishes')
+    try:
+        for title, build in (('orm', orm_path), ('json_agg', json_path)):
+            timings = []
+            for _ in range(repeat):
+                async with session_maker() as session:
+                    repo = MenuRepository(session=session, models_to_json=None, menu_exceptions=None)
+                    start = time.perf_counter()
+                    content = await build(repo)
+                    timings.append(time.perf_counter() - start)
+            print(f'{title:<10} {min(timings) * 1000:10.1f} ms  {len(content) // 1024:8} KB')
+    finally:
+        async with session_maker() as session:
+            await session.execute(delete(Menu).where(Menu.description == 'bench'))
+            await session.commit()
+        await database.dispose_engine()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--menus', type=int, default=100)
+    parser.add_argument('--submenus', type=int, default=50)
+    parser.add_argument('--dishes', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.menus, args.submenus, args.dishes, args.repeat))
@@ -0,0 +1,77 @@
+"""
+Benchmark sync diff of excel menu objects with db rows: list membership checks against hash index
+Sheet: 100 menus x 10 submenus x 100 dishes = 100k dishes, 1% of dishes changed, no database needed
+List membership is O(n^2), so it is measured on --legacy-dishes first dishes only
+Run from project root:
+    PYTHONPATH=src python benchmarks/bench_sync_diff.py
+"""
+import argparse
+import time
+from uuid import uuid4
+
+from celery_app.sync_diff import diff_menu_objects
+
+
+def build_sheet(menus: int, submenus: int, dishes: int) -> tuple[list[dict], list[dict], list[dict]]:
+    """Build excel menu objects"""
+    menu_rows, submenu_rows, dish_rows = [], [], []
+    for menu in range(menus):
+        menu_id = str(uuid4())
+        menu_rows.append({'id': menu_id, 'title': f'Menu {menu}', 'description': 'description'})
+        for submenu in range(submenus):
+            submenu_id = str(uuid4())
+            submenu_rows.append({
+                'id': submenu_id, 'title': f'Submenu {menu}.{submenu}',
+                'description': 'description', 'menu_id': menu_id
+            })
+            for dish in range(dishes):
+                dish_rows.append({
+                    'id': str(uuid4()), 'title': f'Dish {menu}.{submenu}.{dish}',
+                    'description': 'description', 'price': '123.45', 'submenu_id': submenu_id
+                })
+    return menu_rows, submenu_rows, dish_rows
+
+
+def change_sheet(sheet: tuple[list[dict], list[dict], list[dict]]) -> tuple[list[dict], list[dict], list[dict]]:
+    """Copy sheet with every hundredth dish price changed"""
+    menus, submenus, dishes = sheet
+    changed = [dict(dish) for dish in dishes]
+    for dish in changed[::100]:
+        dish['price'] = '99.99'
+    return menus, submenus, changed
+
+
+def legacy_diff(db_rows: list[dict], excel_rows: list[dict]) -> tuple[list[dict], list[dict]]:
+    """Old DBChanger way: membership checks on lists"""
+    return (
+        [row for row in db_rows if row not in excel_rows],
+        [row for row in excel_rows if row not in db_rows],
+    )
+
+
+def main(menus: int, submenus: int, dishes: int, legacy_dishes: int) -> None:
+    """Run benchmark"""
+    db_sheet = build_sheet(menus, submenus, dishes)
+    excel_sheet = change_sheet(db_sheet)
+    total_dishes = len(db_sheet[2])
+
+    start = time.perf_counter()
+    diff = diff_menu_objects(db_sheet, excel_sheet)
+    elapsed = time.perf_counter() - start
+    print(f'hash index {total_dishes:8} dishes {elapsed * 1000:10.1f} ms  updates: {len(diff.dishes.update)}')
+
+    db_dishes, excel_dishes = db_sheet[2][:legacy_dishes], excel_sheet[2][:legacy_dishes]
+    start = time.perf_counter()
+    legacy_diff(db_dishes, excel_dishes)
+    elapsed = time.perf_counter() - start
+    print(f'list       {legacy_dishes:8} dishes {elapsed * 1000:10.1f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--menus', type=int, default=100)
+    parser.add_argument('--submenus', type=int, default=10)
+    parser.add_argument('--dishes', type=int, default=100)
+    parser.add_argument('--legacy-dishes', type=int, default=5000)
+    args = parser.parse_args()
+    main(args.menus, args.submenus, args.dishes, args.legacy_dishes)
@@ -0,0 +1,62 @@
+"""
+Benchmark first import of menu to db: INSERT per row, bulk upsert and COPY
+Only rows of generated sheet are deleted between runs
+Needs database from .env, run from project root:
+    PYTHONPATH=src:benchmarks python benchmarks/bench_sync_write.py --menus 10 --submenus 10 --dishes 100
+"""
+import argparse
+import asyncio
+import time
+
+from bench_sync_diff import build_sheet
+from sqlalchemy import delete, insert
+
+from celery_app.sync_diff import diff_menu_objects
+from celery_app.update_db import DBSync
+from db import database
+from menu_app.models import Base, Dish, Menu, Submenu
+
+
+async def insert_per_row(sync: DBSync) -> None:
+    """Old way: one INSERT for every row"""
+    for model, table_diff in ((Menu, sync.diff.menus), (Submenu, sync.diff.submenus), (Dish, sync.diff.dishes)):
+        for row in table_diff.insert:
+            await sync.session.execute(insert(model).values(**row))
+
+
+async def main(menus: int, submenus: int, dishes: int) -> None:
+    """Run benchmark for every write mode"""
+    session_maker = database.get_session_maker()
+    async with database.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sheet = build_sheet(menus, submenus, dishes)
+    delete_sheet = delete(Menu).where(Menu.id.in_([menu.get('id') for menu in sheet[0]]))
+    print(f'sheet: {len(sheet[0])} menus, {len(sheet[1])} submenus, {len(sheet[2])} dishes')
+    try:
+        for title, write in (
+                ('insert per row', insert_per_row),
+                ('bulk upsert', DBSync.upsert_rows),
+                ('copy', DBSync.copy_rows),
+        ):
+            async with session_maker() as session:
+                await session.execute(delete_sheet)
+                await session.commit()
+                sync = DBSync(session, diff_menu_objects(([], [], []), sheet), initial_load=True)
+                start = time.perf_counter()
+                await write(sync)
+                await session.commit()
+                print(f'{title:<15} {time.perf_counter() - start:8.2f} s')
+    finally:
+        async with session_maker() as session:
+            await session.execute(delete_sheet)
+            await session.commit()
+        await database.dispose_engine()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--menus', type=int, default=10)
+    parser.add_argument('--submenus', type=int, default=10)
+    parser.add_argument('--dishes', type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.menus, args.submenus, args.dishes))
@@ -0,0 +1,61 @@
+"""Admin api routers"""
+from fastapi import APIRouter, Depends, Query
+from redis.asyncio.client import Redis
+from starlette import status
+
+from admin_app.schemas import (
+    DatabasePoolStatsSchema,
+    PoolStatsSchema,
+    RedisPoolStatsSchema,
+    SyncRunSchema,
+    SyncStatsSchema,
+)
+from celery_app.update_db import SyncState
+from config import SYNC_HISTORY_SIZE
+from db.database import get_engine_pool_stats, get_redis_pool_stats, get_redis_session
+
+admin_router = APIRouter(
+    prefix='/api/v1/admin',
+    tags=['Admin']
+)
+
+
+@admin_router.get(
+    '/pool_stats',
+    status_code=status.HTTP_200_OK,
+    response_model=PoolStatsSchema,
+    summary='Connection pools usage'
+)
+async def get_pool_stats() -> PoolStatsSchema:
+    """Get usage stats of shared connection pools"""
+    return PoolStatsSchema(
+        redis=RedisPoolStatsSchema(**get_redis_pool_stats()),
+        database=DatabasePoolStatsSchema(**get_engine_pool_stats()),
+    )
+
+
+@admin_router.get(
+    '/sync_stats',
+    status_code=status.HTTP_200_OK,
+    response_model=SyncStatsSchema,
+    summary='Menu sync runs'
+)
+async def get_sync_stats(
+        redis_session: Redis = Depends(get_redis_session)
+) -> SyncStatsSchema:
+    """Get counters of skipped and applied menu syncs"""
+    return SyncStatsSchema(**await SyncState(redis_session).get_stats())
+
+
+@admin_router.get(
+    '/sync_runs',
+    status_code=status.HTTP_200_OK,
+    response_model=list[SyncRunSchema],
+    summary='Last menu sync runs'
+)
+async def get_sync_runs(
+        limit: int = Query(default=20, ge=1, le=SYNC_HISTORY_SIZE),
+        redis_session: Redis = Depends(get_redis_session)
+) -> list[SyncRunSchema]:
+    """Get phase timings and row counts of last menu syncs, newest first"""
+    return [SyncRunSchema(**record) for record in await SyncState(redis_session).get_history(limit)]
@@ -0,0 +1,41 @@
+"""Schemas for admin endpoints"""
+from pydantic import BaseModel
+
+
+class RedisPoolStatsSchema(BaseModel):
+    """Usage stats of shared redis connection pool"""
+    max_connections: int
+    in_use_connections: int
+    available_connections: int
+
+
+class DatabasePoolStatsSchema(BaseModel):
+    """Usage stats of shared database engine pool"""
+    pool_class: str
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+
+
+class PoolStatsSchema(BaseModel):
+    """Usage stats of shared connection pools"""
+    redis: RedisPoolStatsSchema
+    database: DatabasePoolStatsSchema
+
+
+class SyncStatsSchema(BaseModel):
+    """Counters of menu sync runs from excel document"""
+    skipped: int
+    applied: int
+    last_invalidated_keys: int
+    sheet_hash: str | None
+
+
+class SyncRunSchema(BaseModel):
+    """Phase timings in ms and row counts of one menu sync run"""
+    started_at: float
+    status: str
+    duration_ms: float
+    phases: dict[str, float]
+    counts: dict[str, int]
@@ -1,12 +1,14 @@
 """Config for launch celery"""
-import asyncio
-
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 from sqlalchemy.exc import SQLAlchemyError
 
+from celery_app import runtime
 from celery_app.parser import ExcelParser
-from celery_app.update_db import run_update_base
+from celery_app.telemetry import SyncTelemetry
+from celery_app.update_db import SyncState, run_update_base
 from config import RABBITMQ_HOST, RABBITMQ_PASS, RABBITMQ_PORT, RABBITMQ_USER
+from db.database import get_redis_client
 
 celery_instance = Celery(
     'periodic_task',
@@ -24,13 +26,54 @@ celery_instance.conf.timezone = 'UTC'
 celery_instance.autodiscover_tasks()
 
 
+async def sync_menu(parser: ExcelParser) -> bool:
+    """
+    Parse excel document and update base use engine and redis pool of worker process
+    Skip run without parsing and db session if excel document hash is already applied
+    Changed document is read again and parsed, hash of this read is saved as applied
+    Hash is not saved if other sync holds the lock, so next run applies the document
+    Every run is saved to sync history with phase timings
+    """
+    telemetry = SyncTelemetry()
+    sync_state = SyncState(get_redis_client())
+    status = 'failed'
+    try:
+        if await sync_state.is_applied(parser.read_hash(telemetry)):
+            await sync_state.save_skipped()
+            status = 'skipped'
+            return False
+        sheet_hash, parsed = parser.read_menu(telemetry)
+        with telemetry.phase('discount_index'):
+            parse_menu, parse_submenu, parse_dish, discount_index = await parser.build_menu(parsed)
+        invalidated_keys = await run_update_base(parse_menu, parse_submenu, parse_dish, discount_index, telemetry)
+        if invalidated_keys is None:
+            status = 'locked'
+            return False
+        await sync_state.save_applied(sheet_hash, invalidated_keys)
+        status = 'applied'
+        return True
+    finally:
+        await sync_state.save_run(telemetry.finish(status))
+
+
+@worker_process_init.connect
+def init_worker_runtime(**kwargs) -> None:
+    """Start event loop, engine and redis pool for worker process"""
+    runtime.start()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_runtime(**kwargs) -> None:
+    """Close connections and event loop of worker process"""
+    runtime.shutdown()
+
+
 @celery_instance.task
 def update_base():
     """Periodic task for update base use excel document"""
     try:
         parser = ExcelParser()
-        parse_menu, parse_submenu, parse_dish = asyncio.run(parser.build_menu())
-        asyncio.run(run_update_base(parse_menu, parse_submenu, parse_dish))
+        runtime.run(sync_menu(parser))
         return True
     except FileNotFoundError:
         return False
@@ -1,78 +1,138 @@
 """Parse excel document with menu"""
-import pickle
-from pathlib import Path
-from uuid import uuid4
+import hashlib
+import time
+from typing import Any, Iterable, Iterator
+from uuid import UUID, uuid5
 
-import gspread
-from gspread.client import Client
-from gspread.spreadsheet import Spreadsheet
-from gspread.worksheet import Worksheet
+import orjson
 
-from db.cache_repo import CacheMenuAppKeys
-from db.database import get_redis_session
+from celery_app.sources import SheetSource, get_sheet_source
+from celery_app.telemetry import SyncTelemetry
+from menu_app.utils import DishConverter
+
+SHEET_NAMESPACE = UUID('d6bb57f1-f88d-4054-9b37-d2c4cd8f143a')
 
 
 class ExcelParser:
     """Excel menu parser"""
 
-    def __init__(self) -> None:
-        self.wb: Client = gspread.service_account(filename=Path(__file__).parents[2] / 'test_service.json')
-        self.sheets: Spreadsheet = self.wb.open('Menu')
-        self.sheet: Worksheet = self.sheets.get_worksheet(0)
-        self.redis_session = get_redis_session()
-        self.menu_app_keys = CacheMenuAppKeys()
+    def __init__(self, source: SheetSource | None = None) -> None:
+        self.source = source or get_sheet_source()
+
+    @staticmethod
+    def generate_id(used_ids: set[str], *row_key: str) -> str:
+        """
+        Stable id of sheet row from its number column and parent id
+        Repeated number under same parent gets id with its occurrence
+        """
+        row_id = str(uuid5(SHEET_NAMESPACE, ':'.join(row_key)))
+        occurrence = 1
+        while row_id in used_ids:
+            occurrence += 1
+            row_id = str(uuid5(SHEET_NAMESPACE, ':'.join((*row_key, str(occurrence)))))
+        used_ids.add(row_id)
+        return row_id
 
-    async def build_menu(self):
-        """Read excel document and build 3 list of dict: menu. submenu, dish """
-        menu_list = []
-        submenu_list = []
-        dish_list = []
-        dish_list_with_discount = []
+    @staticmethod
+    def iter_objects(rows: Iterable[list[str]]) -> Iterator[tuple[str, dict]]:
+        """Yield menu, submenu, dish and dish discount objects while rows are read"""
         menu_id = ''
         submenu_id = ''
-        all_values = self.sheet.get_all_values()
-        for rowNumber, row in enumerate(all_values, start=1):
+        used_ids: set[str] = set()
+        for row in rows:
             if row[0].isnumeric():
-                menu_id = uuid4()
-                menu_list.append(
-                    {
-                        'id': str(menu_id),
-                        'title': row[1],
-                        'description': row[2],
-                    })
+                menu_id = ExcelParser.generate_id(used_ids, 'menu', row[0])
+                yield 'menu', {
+                    'id': menu_id,
+                    'title': row[1],
+                    'description': row[2],
+                }
                 continue
             if row[1].isnumeric():
-                submenu_id = uuid4()
-                submenu_list.append(
-                    {
-                        'id': str(submenu_id),
-                        'title': row[2],
-                        'description': row[3],
-                        'menu_id': str(menu_id),
-                    })
+                submenu_id = ExcelParser.generate_id(used_ids, menu_id, 'submenu', row[1])
+                yield 'submenu', {
+                    'id': submenu_id,
+                    'title': row[2],
+                    'description': row[3],
+                    'menu_id': menu_id,
+                }
                 continue
             if row[2].isnumeric():
-                dish_id = uuid4()
-                dish_list.append(
-                    {
-                        'id': str(dish_id),
-                        'title': row[3],
-                        'description': row[4],
-                        'price': str(row[5]).replace(',', '.'),
-                        'submenu_id': str(submenu_id),
-                    })
-                dish_list_with_discount.append(
-                    {
-                        'title': row[3],
-                        'discount': row[6],
-                    }
-                )
-                continue
-        dish_discount_key = self.menu_app_keys.get_dish_discount_key
-        session = await self.redis_session.__anext__()
-        await session.set(dish_discount_key, pickle.dumps(dish_list_with_discount))
+                yield 'dish', {
+                    'id': ExcelParser.generate_id(used_ids, submenu_id, 'dish', row[2]),
+                    'title': row[3],
+                    'description': row[4],
+                    'price': str(row[5]).replace(',', '.'),
+                    'submenu_id': submenu_id,
+                }
+                yield 'discount', {
+                    'title': row[3],
+                    'discount': row[6],
+                }
+
+    @staticmethod
+    def parse_values(
+            all_values: Iterable[list[str]]
+    ) -> tuple[list[dict], list[dict], list[dict], list[dict]]:
+        """Build 4 list of dict from sheet values: menu, submenu, dish, dish discount"""
+        objects: dict[str, list[dict]] = {'menu': [], 'submenu': [], 'dish': [], 'discount': []}
+        for kind, value in ExcelParser.iter_objects(all_values):
+            objects[kind].append(value)
+        return objects['menu'], objects['submenu'], objects['dish'], objects['discount']
+
+    @staticmethod
+    def hash_rows(rows: Iterable[list[str]], sheet_hash: Any) -> Iterator[list[str]]:
+        """Pass rows through and update hash with every row"""
+        for row in rows:
+            sheet_hash.update(orjson.dumps(row))
+            yield row
+
+    @staticmethod
+    def fingerprint(all_values: Iterable[list[str]]) -> str:
+        """Hash of raw values of excel document"""
+        sheet_hash = hashlib.blake2b(digest_size=16)
+        for _ in ExcelParser.hash_rows(all_values, sheet_hash):
+            pass
+        return sheet_hash.hexdigest()
+
+    def read_hash(self, telemetry: SyncTelemetry | None = None) -> str:
+        """
+        Read excel document rows from source and hash them without parsing or keeping rows
+        With telemetry time of waiting rows from source is fetch phase
+        """
+        telemetry = telemetry or SyncTelemetry()
+        return self.fingerprint(telemetry.timed_rows(self.source.iter_rows(), 'fetch'))
+
+    def read_menu(
+            self,
+            telemetry: SyncTelemetry | None = None,
+    ) -> tuple[str, tuple[list[dict], list[dict], list[dict], list[dict]]]:
+        """
+        Read excel document rows once from source, hash and parse them while reading
+        Raw rows are not kept, return hash and parsed objects
+        With telemetry time of waiting rows from source is fetch phase, the rest is parse phase
+        """
+        telemetry = telemetry or SyncTelemetry()
+        sheet_hash = hashlib.blake2b(digest_size=16)
+        fetch = telemetry.phases.get('fetch', 0.0)
+        start = time.perf_counter()
+        parsed = self.parse_values(self.hash_rows(telemetry.timed_rows(self.source.iter_rows(), 'fetch'), sheet_hash))
+        fetch = (telemetry.phases.get('fetch', 0.0) - fetch) / 1000
+        telemetry.add_phase('parse', time.perf_counter() - start - fetch)
+        return sheet_hash.hexdigest(), parsed
+
+    async def build_menu(self, parsed: tuple[list[dict], list[dict], list[dict], list[dict]] | None = None):
+        """
+        Read excel document and build 3 list of dict: menu. submenu, dish and discount index
+        Discount index is saved to redis by sync after commit
+        """
+        if parsed is None:
+            _, parsed = self.read_menu()
+        menu_list, submenu_list, dish_list, dish_list_with_discount = parsed
+        discount_index = await DishConverter.build_discount_index(dish_list_with_discount)
         return (
             menu_list,
             submenu_list,
             dish_list,
+            discount_index,
         )
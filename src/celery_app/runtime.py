@@ -0,0 +1,56 @@
+"""
+Async runtime of celery worker process
+One event loop lives as long as worker process, shared engine and redis pool are bound to it
+"""
+import asyncio
+from typing import Any, Coroutine
+
+from db.database import (
+    close_redis_pool,
+    dispose_engine,
+    get_redis_pool,
+    get_session_maker,
+)
+
+loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return event loop of worker process, create it if not exists"""
+    global loop
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+    return loop
+
+
+def run(coroutine: Coroutine) -> Any:
+    """Run coroutine on event loop of worker process"""
+    return get_loop().run_until_complete(coroutine)
+
+
+async def _open_connections() -> None:
+    """Create shared engine and redis pool on worker loop"""
+    get_session_maker()
+    get_redis_pool()
+
+
+async def _close_connections() -> None:
+    """Close shared redis pool and engine"""
+    await close_redis_pool()
+    await dispose_engine()
+
+
+def start() -> None:
+    """Set up loop, engine and redis pool once per worker process"""
+    run(_open_connections())
+
+
+def shutdown() -> None:
+    """Close connections and event loop of worker process"""
+    global loop
+    if loop is None or loop.is_closed():
+        return
+    loop.run_until_complete(_close_connections())
+    loop.close()
+    loop = None
@@ -0,0 +1,73 @@
+"""Sources of excel document rows for parser"""
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Iterator
+
+import gspread
+from openpyxl import load_workbook
+
+from config import SHEET_SOURCE, SHEET_XLSX_PATH
+
+PROJECT_ROOT = Path(__file__).parents[2]
+SHEET_COLUMNS = 7
+
+
+class SheetSource(ABC):
+    """Base source, yield rows of excel document as lists of strings"""
+
+    @abstractmethod
+    def iter_rows(self) -> Iterator[list[str]]:
+        """Yield rows of first worksheet"""
+
+
+class GoogleSheetSource(SheetSource):
+    """Google spreadsheet 'Menu' read with service account, whole sheet is loaded by one request"""
+
+    def __init__(
+            self,
+            filename: Path = PROJECT_ROOT / 'test_service.json',
+            title: str = 'Menu',
+    ) -> None:
+        self.filename = filename
+        self.title = title
+
+    def iter_rows(self) -> Iterator[list[str]]:
+        """Yield rows of first worksheet"""
+        client = gspread.service_account(filename=self.filename)
+        yield from client.open(self.title).get_worksheet(0).get_all_values()
+
+
+class XlsxSource(SheetSource):
+    """Local xlsx workbook read in read only mode, rows are streamed one by one"""
+
+    def __init__(
+            self,
+            path: Path = PROJECT_ROOT / SHEET_XLSX_PATH,
+    ) -> None:
+        self.path = path
+
+    @staticmethod
+    def convert_cell(value: Any) -> str:
+        """Convert cell value to string as google sheet shows it"""
+        if value is None:
+            return ''
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+
+    def iter_rows(self) -> Iterator[list[str]]:
+        """Yield rows of first worksheet padded to sheet columns"""
+        workbook = load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            for row in workbook.worksheets[0].iter_rows(values_only=True):
+                values = [self.convert_cell(value) for value in row]
+                yield values + [''] * (SHEET_COLUMNS - len(values))
+        finally:
+            workbook.close()
+
+
+def get_sheet_source() -> SheetSource:
+    """Get source configured by SHEET_SOURCE: gspread or xlsx"""
+    if SHEET_SOURCE == 'xlsx':
+        return XlsxSource()
+    return GoogleSheetSource()
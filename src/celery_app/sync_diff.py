@@ -0,0 +1,68 @@
+"""Diff engine for sync menu objects from excel document with db"""
+from operator import itemgetter
+from typing import Mapping, Sequence
+
+MENU_FIELDS = ('title', 'description')
+SUBMENU_FIELDS = ('title', 'description', 'menu_id')
+DISH_FIELDS = ('title', 'description', 'price', 'submenu_id')
+
+
+class TableDiff:
+    """Rows to insert, update and ids to delete for one table"""
+
+    def __init__(self) -> None:
+        self.insert: list[dict] = []
+        self.update: list[dict] = []
+        self.delete: list[str] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.insert or self.update or self.delete)
+
+
+class SyncDiff:
+    """Diff of menus, submenus and dishes"""
+
+    def __init__(self, menus: TableDiff, submenus: TableDiff, dishes: TableDiff) -> None:
+        self.menus = menus
+        self.submenus = submenus
+        self.dishes = dishes
+
+    def __bool__(self) -> bool:
+        return bool(self.menus or self.submenus or self.dishes)
+
+
+def diff_table(
+        db_rows: Sequence[Mapping],
+        excel_rows: Sequence[dict],
+        fields: Sequence[str],
+) -> TableDiff:
+    """
+    Index db rows by id and content key, then pass excel rows once
+    Content key is tuple of fields values, db values are selected as strings
+    New ids are inserted, changed content is updated, ids left in index are deleted
+    """
+    get_content_key = itemgetter(*fields)
+    db_index = {str(row['id']): get_content_key(row) for row in db_rows}
+    diff = TableDiff()
+    for row in excel_rows:
+        db_key = db_index.pop(str(row['id']), None)
+        if db_key is None:
+            diff.insert.append(row)
+        elif db_key != get_content_key(row):
+            diff.update.append(row)
+    diff.delete.extend(db_index)
+    return diff
+
+
+def diff_menu_objects(
+        db_objects: tuple[Sequence[Mapping], Sequence[Mapping], Sequence[Mapping]],
+        excel_objects: tuple[list[dict], list[dict], list[dict]],
+) -> SyncDiff:
+    """Build diff for menus, submenus and dishes"""
+    db_menus, db_submenus, db_dishes = db_objects
+    excel_menus, excel_submenus, excel_dishes = excel_objects
+    return SyncDiff(
+        diff_table(db_menus, excel_menus, MENU_FIELDS),
+        diff_table(db_submenus, excel_submenus, SUBMENU_FIELDS),
+        diff_table(db_dishes, excel_dishes, DISH_FIELDS),
+    )
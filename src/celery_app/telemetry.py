@@ -0,0 +1,58 @@
+"""Timings of sync run phases and counts of synced rows"""
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, TypeVar
+
+Row = TypeVar('Row')
+
+
+class SyncTelemetry:
+    """Collect phase timings in ms and row counts of one sync run"""
+
+    def __init__(self) -> None:
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.status = 'running'
+        self.phases: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+
+    def add_phase(self, name: str, elapsed: float) -> None:
+        """Add elapsed seconds to phase"""
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed * 1000
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measure time of block as phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - start)
+
+    def timed_rows(self, rows: Iterable[Row], name: str) -> Iterator[Row]:
+        """Pass rows through and measure time of waiting every row as phase"""
+        iterator = iter(rows)
+        while True:
+            start = time.perf_counter()
+            try:
+                row = next(iterator)
+            except StopIteration:
+                self.add_phase(name, time.perf_counter() - start)
+                return
+            self.add_phase(name, time.perf_counter() - start)
+            yield row
+
+    def count(self, **counts: int) -> None:
+        """Set row counts"""
+        self.counts.update(counts)
+
+    def finish(self, status: str) -> dict:
+        """Set run status and return run record"""
+        self.status = status
+        return {
+            'started_at': self.started_at,
+            'status': self.status,
+            'duration_ms': round((time.perf_counter() - self.start) * 1000, 3),
+            'phases': {name: round(elapsed, 3) for name, elapsed in self.phases.items()},
+            'counts': self.counts,
+        }
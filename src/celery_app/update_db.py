@@ -1,391 +1,409 @@
 """Create update and change db use excel document"""
-import pickle
-from typing import Sequence
+import uuid
+from typing import Iterable, Sequence, TypedDict
 
+import orjson
 from redis.asyncio.client import Redis
-from sqlalchemy import RowMapping, String, cast, delete, insert, select, update
+from sqlalchemy import (
+    RowMapping,
+    String,
+    any_,
+    bindparam,
+    cast,
+    delete,
+    func,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.cache_repo import CacheMenuAppKeys
-from db.database import get_async_session, get_redis_session
+from celery_app.sync_diff import (
+    DISH_FIELDS,
+    MENU_FIELDS,
+    SUBMENU_FIELDS,
+    SyncDiff,
+    diff_menu_objects,
+)
+from celery_app.telemetry import SyncTelemetry
+from config import SYNC_BATCH_SIZE, SYNC_HASH_TTL, SYNC_HISTORY_SIZE, SYNC_USE_COPY
+from db.cache_repo import CacheMenuAppKeys, CacheRepository
+from db.database import get_redis_client, get_session_maker
+from menu_app.counters import refresh_counters
+from menu_app.invalidation import InvalidationPlanner
 from menu_app.models import Dish, Menu, Submenu
+from menu_app.utils import DishConverter
+
+SYNC_LOCK_KEY = 0x6D656E75
+
+
+class SyncStats(TypedDict):
+    """Counters of sync runs and last applied hash"""
+    skipped: int
+    applied: int
+    last_invalidated_keys: int
+    sheet_hash: str | None
 
 
 class ExcelRedisKeys(CacheMenuAppKeys):
     """Class for store excel redis keys """
     @staticmethod
-    def get_excel_menu_key() -> str:
-        """return excel menu redis key"""
-        return 'excel_menu_key'
+    def get_sheet_hash_key() -> str:
+        """return redis key of last applied excel document hash"""
+        return 'sync_sheet_hash'
 
     @staticmethod
-    def get_excel_submenu_key() -> str:
-        """return excel submenu redis key"""
-        return 'excel_submenu_key'
+    def get_sync_skipped_key() -> str:
+        """return redis key of counter syncs skipped by unchanged hash"""
+        return 'sync_runs_skipped'
 
     @staticmethod
-    def get_excel_dish_key() -> str:
-        """return excel dish redis key"""
-        return 'excel_dish_key'
+    def get_sync_applied_key() -> str:
+        """return redis key of counter applied syncs"""
+        return 'sync_runs_applied'
 
     @staticmethod
-    async def delete_by_pattern(redis_session: Redis, key: str) -> None:
-        """return excel dish redis key"""
-        [await redis_session.delete(key) for key in await redis_session.keys(f'{key}*')]
+    def get_sync_invalidated_keys_key() -> str:
+        """return redis key of count cache versions bumped by last applied sync"""
+        return 'sync_invalidated_keys'
 
+    @staticmethod
+    def get_sync_history_key() -> str:
+        """return redis key of list with records of last sync runs"""
+        return 'sync_history'
 
-class DBSelector(ExcelRedisKeys):
-    """Class for select menu objects instance and redis instance"""
+
+class SyncState(ExcelRedisKeys):
+    """Class for last applied excel document hash, sync runs counters and history"""
 
     def __init__(
             self,
-            session: AsyncSession,
             redis_session: Redis,
     ) -> None:
-        self.session = session
         self.redis_session = redis_session
         super().__init__()
 
+    async def is_applied(self, sheet_hash: str) -> bool:
+        """Check excel document with hash is already applied to db"""
+        return await self.redis_session.get(self.get_sheet_hash_key()) == sheet_hash.encode()
+
+    async def save_skipped(self) -> None:
+        """Count sync skipped by unchanged hash"""
+        await self.redis_session.incr(self.get_sync_skipped_key())
+
+    async def save_applied(self, sheet_hash: str, invalidated_keys: int) -> None:
+        """
+        Save hash of applied excel document, count applied sync and cache versions bumped by it
+        Hash expires, so db is reconciled with excel document at least once per SYNC_HASH_TTL
+        """
+        async with self.redis_session.pipeline(transaction=True) as pipe:
+            pipe.set(self.get_sheet_hash_key(), sheet_hash, ex=SYNC_HASH_TTL)
+            pipe.incr(self.get_sync_applied_key())
+            pipe.set(self.get_sync_invalidated_keys_key(), invalidated_keys)
+            await pipe.execute()
+
+    async def save_run(self, record: dict) -> None:
+        """Push record of sync run to history, keep only SYNC_HISTORY_SIZE last runs"""
+        async with self.redis_session.pipeline(transaction=True) as pipe:
+            pipe.lpush(self.get_sync_history_key(), orjson.dumps(record))
+            pipe.ltrim(self.get_sync_history_key(), 0, SYNC_HISTORY_SIZE - 1)
+            await pipe.execute()
+
+    async def get_history(self, limit: int = SYNC_HISTORY_SIZE) -> list[dict]:
+        """Get records of last sync runs, newest first"""
+        return [
+            orjson.loads(record)
+            for record in await self.redis_session.lrange(self.get_sync_history_key(), 0, limit - 1)
+        ]
+
+    async def get_stats(self) -> SyncStats:
+        """Get sync runs counters and last applied hash"""
+        skipped, applied, invalidated_keys, sheet_hash = await self.redis_session.mget(
+            self.get_sync_skipped_key(),
+            self.get_sync_applied_key(),
+            self.get_sync_invalidated_keys_key(),
+            self.get_sheet_hash_key(),
+        )
+        return {
+            'skipped': int(skipped or 0),
+            'applied': int(applied or 0),
+            'last_invalidated_keys': int(invalidated_keys or 0),
+            'sheet_hash': sheet_hash.decode() if sheet_hash else None,
+        }
+
+
+class DBSelector:
+    """Class for select menu objects from db"""
+
+    def __init__(
+            self,
+            session: AsyncSession,
+    ) -> None:
+        self.session = session
+
     async def get_menu_objects(
             self
     ) -> tuple[Sequence[RowMapping], Sequence[RowMapping], Sequence[RowMapping]]:
         """Get current menus, submenus, dishes from db"""
         menus = (await self.session.execute(
             select(cast(Menu.id, String), Menu.title, Menu.description)
-            .order_by(Menu.id))).mappings().all()
+        )).mappings().all()
         submenus = (await self.session.execute(
             select(cast(Submenu.id, String), Submenu.title, Submenu.description, cast(Submenu.menu_id, String))
-            .order_by(Submenu.id))).mappings().all()
+        )).mappings().all()
         dishes = (await self.session.execute(
             select(cast(Dish.id, String), Dish.title, Dish.description, Dish.price, cast(Dish.submenu_id, String))
-            .order_by(Dish.id))).mappings().all()
+        )).mappings().all()
         return menus, submenus, dishes
 
-    async def get_saved_menu_excel_objects(
-            self
-    ) -> tuple[list[dict], list[dict], list[dict]] | tuple[list, list, list]:
-        """Get current excel menus, excel submenus, excel dishes from redis"""
-        bytes_menu_array = await self.redis_session.get(name=self.get_excel_menu_key())
-        bytes_submenu_array = await self.redis_session.get(self.get_excel_submenu_key())
-        bytes_dish_array = await self.redis_session.get(self.get_excel_dish_key())
-        if bytes_menu_array is None or bytes_submenu_array is None or bytes_dish_array is None:
-            return [], [], []
-        return pickle.loads(bytes_menu_array), pickle.loads(bytes_submenu_array), pickle.loads(bytes_dish_array)
-
 
-class DBCreator(ExcelRedisKeys):
-    """Class for fill tables in db"""
+class DBSync:
+    """Class for apply diff of excel menu objects to db with bulk statements"""
 
     def __init__(
             self,
             session: AsyncSession,
-            redis_session: Redis,
-            excel_menu: list[dict],
-            excel_submenu: list[dict],
-            excel_dish: list[dict]
+            diff: SyncDiff,
+            initial_load: bool = False,
     ) -> None:
         self.session = session
-        self.redis_session = redis_session
-
-        self.excel_menu = excel_menu
-        self.excel_submenu = excel_submenu
-        self.excel_dish = excel_dish
-        super().__init__()
-
-    async def check_db_state(self) -> bool:
-        """Check if db empty insert data from Excel and clean db if Excel empty"""
-        if not (await self.session.execute(select(Menu))).scalars().all():
-            return False
-        if not (self.excel_menu and self.excel_submenu and self.excel_dish):
-            await self.session.execute(delete(Menu))
-            await self.session.execute(delete(Submenu))
-            await self.session.execute(delete(Dish))
-            await self.session.commit()
-
-            await self.redis_session.delete(self.get_excel_menu_key())
-            await self.redis_session.delete(self.get_excel_submenu_key())
-            await self.redis_session.delete(self.get_excel_dish_key())
-            return False
-        return True
-
-    async def create_menu(self) -> None:
-        """create menu from list excel menu"""
-        for excel_menu in self.excel_menu:
-            stmt = insert(Menu).values(
-                id=excel_menu.get('id'),
-                title=excel_menu.get('title'),
-                description=excel_menu.get('description'),
+        self.diff = diff
+        self.initial_load = initial_load
+
+    async def upsert_rows(self) -> None:
+        """
+        Insert new and update changed menus, submenus, dishes, parents first
+        One INSERT ... ON CONFLICT DO UPDATE executed for batch of rows
+        """
+        for model, table_diff, fields in (
+                (Menu, self.diff.menus, MENU_FIELDS),
+                (Submenu, self.diff.submenus, SUBMENU_FIELDS),
+                (Dish, self.diff.dishes, DISH_FIELDS),
+        ):
+            rows = table_diff.insert + table_diff.update
+            stmt = pg_insert(model)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[model.__table__.c.id],
+                set_={field: stmt.excluded[field] for field in fields}
             )
-            await self.session.execute(stmt)
-        await self.session.commit()
-
-    async def create_submenu(self) -> None:
-        """create submenu from list excel submenu"""
-        for excel_submenu in self.excel_submenu:
-            stmt = insert(Submenu).values(
-                id=excel_submenu.get('id'),
-                title=excel_submenu.get('title'),
-                description=excel_submenu.get('description'),
-                menu_id=excel_submenu.get('menu_id')
+            for start in range(0, len(rows), SYNC_BATCH_SIZE):
+                await self.session.execute(stmt, rows[start:start + SYNC_BATCH_SIZE])
+
+    async def copy_rows(self) -> None:
+        """Copy new menus, submenus, dishes to empty tables with asyncpg COPY, parents first"""
+        connection = (await (await self.session.connection()).get_raw_connection()).driver_connection
+        if connection is None:
+            raise RuntimeError('asyncpg connection of session is closed')
+        dishes = [
+            {**dish, **await DishConverter.return_dish_pricing(dish['title'], dish['price'], None)}
+            for dish in self.diff.dishes.insert
+        ]
+        for model, rows, columns in (
+                (Menu, self.diff.menus.insert, ('id', *MENU_FIELDS)),
+                (Submenu, self.diff.submenus.insert, ('id', *SUBMENU_FIELDS)),
+                (Dish, dishes, ('id', *DISH_FIELDS, 'discount', 'discounted_price')),
+        ):
+            await connection.copy_records_to_table(
+                model.__tablename__,
+                records=[tuple(row.get(column) for column in columns) for row in rows],
+                columns=columns,
             )
-            await self.session.execute(stmt)
-        await self.session.commit()
-
-    async def create_dish(self) -> None:
-        """create dish from list excel dish"""
-        for excel_dish in self.excel_dish:
-            stmt = insert(Dish).values(
-                id=excel_dish.get('id'),
-                title=excel_dish.get('title'),
-                description=excel_dish.get('description'),
-                price=excel_dish.get('price'),
-                submenu_id=excel_dish.get('submenu_id'),
-            ).returning(Dish)
-            await self.session.execute(stmt)
-        await self.session.commit()
-
-    async def update_redis_excel_data(self) -> bool:
-        """Update redis excel keys"""
-        menu_bytes = await self.redis_session.get(self.get_excel_menu_key())
-        submenu_bytes = await self.redis_session.get(self.get_excel_submenu_key())
-        dish_bytes = await self.redis_session.get(self.get_excel_dish_key())
-        if menu_bytes is not None and submenu_bytes is not None and dish_bytes is not None:
-            menu = pickle.loads(menu_bytes)
-            submenu = pickle.loads(submenu_bytes)
-            dish = pickle.loads(dish_bytes)
-            if len(menu) != len(self.excel_menu) or \
-                    len(menu) != len(self.excel_menu) or \
-                    len(menu) != len(self.excel_menu):
-                return False
-            for (index, obj) in enumerate(menu):
-                obj['title'] = self.excel_menu[index].get('title')
-                obj['description'] = self.excel_menu[index].get('description')
-            for (index, obj) in enumerate(submenu):
-                obj['title'] = self.excel_submenu[index].get('title')
-                obj['description'] = self.excel_submenu[index].get('description')
-            for (index, obj) in enumerate(dish):
-                obj['title'] = self.excel_dish[index].get('title')
-                obj['description'] = self.excel_dish[index].get('description')
-                obj['price'] = self.excel_dish[index].get('price')
-
-            await self.redis_session.set(self.get_excel_menu_key(), pickle.dumps(menu))
-            await self.redis_session.set(self.get_excel_submenu_key(), pickle.dumps(submenu))
-            await self.redis_session.set(self.get_excel_dish_key(), pickle.dumps(dish))
-        return True
 
-    async def create_data_in_db(self) -> bool:
-        """create menu, submenu, dish instance and create records with them in redis"""
-        await self.update_redis_excel_data()
-        if await self.check_db_state():
+    async def delete_rows(self) -> None:
+        """Delete missing dishes, submenus, menus with one statement per table, children first"""
+        for model, table_diff in (
+                (Dish, self.diff.dishes),
+                (Submenu, self.diff.submenus),
+                (Menu, self.diff.menus),
+        ):
+            if table_diff.delete:
+                await self.session.execute(
+                    delete(model)
+                    .where(model.__table__.c.id == any_(bindparam('ids', table_diff.delete, type_=ARRAY(UUID(as_uuid=False)))))
+                )
+
+    async def apply(self) -> bool:
+        """Apply diff to db without commit, return True if db changed"""
+        if not self.diff:
             return False
-        await self.create_menu()
-        await self.create_submenu()
-        await self.create_dish()
-
-        await self.redis_session.set(self.get_excel_menu_key(), pickle.dumps(self.excel_menu))
-        await self.redis_session.set(self.get_excel_submenu_key(), pickle.dumps(self.excel_submenu))
-        await self.redis_session.set(self.get_excel_dish_key(), pickle.dumps(self.excel_dish))
+        if self.initial_load and SYNC_USE_COPY:
+            await self.copy_rows()
+        else:
+            await self.upsert_rows()
+            await self.delete_rows()
         return True
 
 
-class DBChanger(ExcelRedisKeys):
-    """Class DB changer"""
+class DishPricing:
+    """Class for store dish discount and discounted price computed from discount index"""
 
     def __init__(
             self,
             session: AsyncSession,
-            redis_session: Redis,
-            menus: Sequence[RowMapping],
-            submenus: Sequence[RowMapping],
-            dishes: Sequence[RowMapping],
-            excel_saved_menus: list[dict],
-            excel_saved_submenus: list[dict],
-            excel_saved_dishes: list[dict],
+            discount_index: dict[str, str],
     ) -> None:
         self.session = session
-        self.redis_session = redis_session
-        self.db_menus = menus
-        self.db_submenus = submenus
-        self.db_dishes = dishes
-        self.excel_menus = excel_saved_menus
-        self.excel_submenus = excel_saved_submenus
-        self.excel_dishes = excel_saved_dishes
-        super().__init__()
+        self.discount_index = discount_index
 
-    async def change_menu(self) -> None:
-        """Change menu model"""
-        if len(self.db_menus) > len(self.excel_menus):
-            for db_menu_model in self.db_menus:
-                if db_menu_model not in self.excel_menus:
-                    await self.session.execute(delete(Menu).where(Menu.id == db_menu_model.get('id')))
-                    await self.delete_by_pattern(self.redis_session, self.get_list_common_key)
-
-        elif len(self.db_menus) < len(self.excel_menus):
-            for excel_menu in self.excel_menus:
-                if excel_menu not in self.db_menus:
-                    await self.session.execute(insert(Menu).values(**excel_menu))
-            await self.session.commit()
-            await self.delete_by_pattern(self.redis_session, self.get_list_common_key)
-
-    async def change_submenu(self) -> None:
-        """Change submenu model"""
-        if len(self.db_submenus) > len(self.excel_submenus):
-            for db_submenu_model in self.db_submenus:
-                if db_submenu_model not in self.excel_submenus:
-                    await self.session.execute(delete(Submenu).where(Submenu.id == db_submenu_model.get('id')))
-                    await self.delete_by_pattern(self.redis_session, self.get_list_common_key)
-        elif len(self.db_submenus) < len(self.excel_submenus):
-            for excel_submenu in self.excel_submenus:
-                if excel_submenu not in self.db_submenus:
-                    await self.session.execute(insert(Submenu).values(**excel_submenu))
-
-            await self.delete_by_pattern(self.redis_session, self.get_list_common_key)
-            await self.session.commit()
-
-    async def change_dish(self) -> None:
-        """Change dish model"""
-        if len(self.db_dishes) > len(self.excel_dishes):
-            for db_dish_model in self.db_dishes:
-                if db_dish_model not in self.excel_dishes:
-                    await self.session.execute(delete(Dish).where(Dish.id == db_dish_model.get('id')))
-                    await self.delete_by_pattern(self.redis_session, self.get_list_dishes_key)
-                    await self.delete_by_pattern(self.redis_session, self.get_list_menus_nested_key)
-        elif len(self.db_dishes) < len(self.excel_dishes):
-            for excel_dish in self.excel_dishes:
-                if excel_dish not in self.db_dishes:
-                    await self.session.execute(insert(Dish).values(**excel_dish))
-            await self.session.commit()
-            await self.delete_by_pattern(self.redis_session, self.get_list_dishes_key)
-            await self.delete_by_pattern(self.redis_session, self.get_list_menus_nested_key)
-
-    async def check_db_change(self) -> None:
-        """Check db check_db_change"""
-        await self.change_menu()
-        await self.change_submenu()
-        await self.change_dish()
-
-
-class DBUpdater(ExcelRedisKeys):
-    """Class DB updated"""
+    async def update_pricing(self) -> list[dict]:
+        """
+        Update dishes with changed pricing without commit
+        Return ids and submenu ids of updated dishes
+        """
+        dishes = (await self.session.execute(
+            select(Dish.id, Dish.submenu_id, Dish.title, Dish.price, Dish.discount, Dish.discounted_price)
+        )).mappings().all()
+        changed, submenu_ids = [], []
+        for dish in dishes:
+            pricing = await DishConverter.return_dish_pricing(dish['title'], dish['price'], self.discount_index)
+            if pricing.get('discount') != dish.get('discount') or \
+                    pricing.get('discounted_price') != dish.get('discounted_price'):
+                changed.append({'id': dish.get('id'), **pricing})
+                submenu_ids.append(dish.get('submenu_id'))
+        if changed:
+            await self.session.execute(update(Dish), changed)
+        return [
+            {'id': dish.get('id'), 'submenu_id': submenu_id}
+            for dish, submenu_id in zip(changed, submenu_ids)
+        ]
+
+
+class SyncInvalidation(ExcelRedisKeys):
+    """
+    Class for collect cache scopes changed by sync
+    Parents of changed rows are found by db and excel rows, moved rows change old and new parents
+    Versions of changed scopes are bumped once after commit
+    """
 
     def __init__(
             self,
-            session: AsyncSession,
             redis_session: Redis,
-            menus: Sequence[RowMapping],
-            submenus: Sequence[RowMapping],
-            dishes: Sequence[RowMapping],
-            excel_menus: list[dict],
-            excel_submenus: list[dict],
-            excel_dishes: list[dict],
     ) -> None:
-        self.session = session
-        self.redis_session = redis_session
-        self.db_menus = menus
-        self.db_submenus = submenus
-        self.db_dishes = dishes
-        self.excel_menus = excel_menus
-        self.excel_submenus = excel_submenus
-        self.excel_dishes = excel_dishes
         super().__init__()
+        self.redis_session = redis_session
+        self.planner = InvalidationPlanner()
+        self.scopes: set[str] = set()
+        self.parents: dict[str, dict[str, set[str]]] = {self.get_submenu_key: {}, self.get_dish_key: {}}
 
-    async def sorted_dict_by_id(self, sequence: list[dict]):
-        if not sequence:
-            return []
-        return sorted(sequence, key=lambda obj: obj.get('id'))
-
-    async def check_menu_update(self) -> bool:
-        """Check menu models and update it from excel menus"""
-        if len(self.db_menus) != len(self.excel_menus) or not self.excel_menus:
-            return False
-        sorted_menu = await self.sorted_dict_by_id(self.excel_menus)
-        for menu_obj, excel_menu in zip(self.db_menus, sorted_menu):
-            if (menu_obj.get('title') != excel_menu.get('title')) or \
-                    (menu_obj.get('description') != excel_menu.get('description')):
-                await self.session.execute(update(Menu).where(Menu.id == excel_menu.get('id'))
-                                           .values(
-                    title=excel_menu.get('title'),
-                    description=excel_menu.get('description')
-                ))
-                await self.delete_by_pattern(self.redis_session, self.get_menu_key)
-                await self.delete_by_pattern(self.redis_session, self.get_list_menus_key)
-                await self.delete_by_pattern(self.redis_session, self.get_list_menus_nested_key)
-        await self.session.commit()
-        return True
-
-    async def check_submenu_update(self) -> bool:
-        """Check submenu models and update it from excel submenus"""
-        if len(self.db_submenus) != len(self.excel_submenus):
-            return False
-        sorted_submenu = await self.sorted_dict_by_id(self.excel_submenus)
-        for submenu_obj, excel_submenu in zip(self.db_submenus, sorted_submenu):
-            if submenu_obj.get('title') != excel_submenu.get('title') or \
-                    submenu_obj.get('description') != excel_submenu.get('description'):
-                await self.session.execute(update(Submenu).where(Submenu.id == excel_submenu.get('id'))
-                                           .values(
-                    title=excel_submenu.get('title'),
-                    description=excel_submenu.get('description')
-                ))
-                await self.delete_by_pattern(self.redis_session, self.get_menu_key)
-                await self.delete_by_pattern(self.redis_session, self.get_submenu_key)
-                await self.delete_by_pattern(self.redis_session, self.get_list_submenus_key)
-                await self.delete_by_pattern(self.redis_session, self.get_list_menus_nested_key)
-        await self.session.commit()
-        return True
-
-    async def check_dish_update(self) -> bool:
-        """Check dish models and update it from Excel dishes"""
-        if len(self.db_dishes) != len(self.excel_dishes):
-            return False
-        sorted_dish = await self.sorted_dict_by_id(self.excel_dishes)
-        for dish_obj, excel_dish in zip(self.db_dishes, sorted_dish):
-            if dish_obj.get('title') != excel_dish.get('title') or \
-                    dish_obj.get('description') != excel_dish.get('description') or \
-                    dish_obj.get('price') != excel_dish.get('price'):
-
-                await self.session.execute(update(Dish).where(Dish.id == excel_dish.get('id'))
-                                           .values(
-                    title=excel_dish.get('title'),
-                    description=excel_dish.get('description'),
-                    price=excel_dish.get('price')
-                ))
-                await self.delete_by_pattern(self.redis_session, self.get_menu_key)
-                await self.delete_by_pattern(self.redis_session, self.get_submenu_key)
-                await self.delete_by_pattern(self.redis_session, self.get_dish_key)
-                await self.delete_by_pattern(self.redis_session, self.get_list_dishes_key)
-                await self.delete_by_pattern(self.redis_session, self.get_list_menus_nested_key)
-        await self.session.commit()
-        return True
-
-    async def check_db_update(self) -> None:
-        """Check menu objects for invalid data and update"""
-        await self.check_menu_update()
-        await self.check_submenu_update()
-        await self.check_dish_update()
-
-
-async def run_update_base(excel_menu, excel_submenu, excel_dish) -> None:
-    """Run creator changer and updater for db from Excel"""
-    gen_async_session = get_async_session()
-    session = await gen_async_session.__anext__()
-
-    gen_redis_session = get_redis_session()
-    redis_session = await gen_redis_session.__anext__()
-
-    creator = DBCreator(session, redis_session, excel_menu, excel_submenu, excel_dish)
-    await creator.create_data_in_db()
-
-    selector = DBSelector(session, redis_session)
-    db_menu, db_submenu, db_dish = await selector.get_menu_objects()
-    excel_saved_menus, excel_saved_submenus, excel_saved_dishes = await selector.get_saved_menu_excel_objects()
-    changer = DBChanger(
-        session, redis_session, db_menu, db_submenu, db_dish,
-        excel_saved_menus, excel_saved_submenus, excel_saved_dishes
-    )
-    updater = DBUpdater(
-        session, redis_session, db_menu, db_submenu, db_dish,
-        excel_saved_menus, excel_saved_submenus, excel_saved_dishes
+    def add_parents(
+            self,
+            db_objects: tuple[Sequence, Sequence, Sequence],
+            excel_objects: tuple[list[dict], list[dict], list[dict]],
+    ) -> None:
+        """Index parents of db and excel submenus and dishes, deleted rows are found by db rows"""
+        for _, submenus, dishes in (db_objects, excel_objects):
+            for key, parent_field, rows in (
+                    (self.get_submenu_key, 'menu_id', submenus),
+                    (self.get_dish_key, 'submenu_id', dishes),
+            ):
+                for row in rows:
+                    self.parents[key].setdefault(str(row['id']), set()).add(str(row[parent_field]))
+
+    def get_parents(self, key: str, identifier: uuid.UUID | str) -> set[str]:
+        """Get ids of parents of submenu or dish"""
+        return self.parents[key].get(str(identifier), set())
+
+    def add_submenus(self, submenu_ids: Iterable[uuid.UUID | str]) -> None:
+        """Add scopes changed by submenus"""
+        for submenu_id in submenu_ids:
+            for menu_id in self.get_parents(self.get_submenu_key, submenu_id):
+                self.scopes.update(self.planner.submenu_changed(menu_id, submenu_id))
+
+    def add_dishes(self, dish_ids: Iterable[uuid.UUID | str]) -> None:
+        """Add scopes changed by dishes"""
+        for dish_id in dish_ids:
+            for submenu_id in self.get_parents(self.get_dish_key, dish_id):
+                for menu_id in self.get_parents(self.get_submenu_key, submenu_id):
+                    self.scopes.update(self.planner.dish_changed(menu_id, submenu_id))
+
+    def add_diff(self, diff: SyncDiff) -> None:
+        """Add scopes changed by inserted, updated and deleted rows"""
+        if diff.menus.insert:
+            self.scopes.update(self.planner.menu_created())
+        for row in diff.menus.update:
+            self.scopes.update(self.planner.menu_updated(row['id']))
+        for menu_id in diff.menus.delete:
+            self.scopes.update(self.planner.menu_deleted(menu_id, ()))
+        for add_rows, table_diff in ((self.add_submenus, diff.submenus), (self.add_dishes, diff.dishes)):
+            add_rows(row['id'] for row in table_diff.insert + table_diff.update)
+            add_rows(table_diff.delete)
+
+    def add_pricing(self, dishes: list[dict]) -> None:
+        """Add scopes changed by dishes with changed pricing"""
+        self.add_dishes(dish['id'] for dish in dishes)
+
+    def add_counters(self, menu_ids: list[uuid.UUID], submenu_ids: list[uuid.UUID]) -> None:
+        """Add scopes of menus and submenus with changed counters"""
+        self.scopes.update(self.planner.menu_scope(menu_id) for menu_id in menu_ids)
+        self.scopes.update(self.planner.submenu_scope(submenu_id) for submenu_id in submenu_ids)
+
+    async def save_discount_index(self, discount_index: dict[str, str]) -> None:
+        """Save discount index of committed sync for dish reads"""
+        cache = CacheRepository(self.redis_session)
+        await cache.set(self.get_dish_discount_key, discount_index)
+        await cache.invalidate_local([self.get_dish_discount_key])
+
+    async def invalidate(self) -> int:
+        """Bump versions of changed scopes in one pipeline, return count bumped versions"""
+        if not self.scopes:
+            return 0
+        await CacheRepository(self.redis_session).bump_versions(sorted(self.scopes))
+        return len(self.scopes)
+
+
+async def run_update_base(
+        excel_menu,
+        excel_submenu,
+        excel_dish,
+        discount_index,
+        telemetry: SyncTelemetry | None = None,
+) -> int | None:
+    """
+    Diff excel menu objects with db, apply diff, update pricing and counters in one transaction
+    Transaction holds advisory lock, run exits if other sync holds it
+    Changed cache scopes are collected during run, after commit discount index is saved
+    and versions of changed scopes are bumped once
+    Phase timings and row counts are recorded to telemetry
+    Return count bumped cache versions or None if lock is not acquired
+    """
+    telemetry = telemetry or SyncTelemetry()
+    invalidation = SyncInvalidation(get_redis_client())
+    async with get_session_maker()() as session:
+        with telemetry.phase('lock'):
+            locked = (await session.execute(select(func.pg_try_advisory_xact_lock(SYNC_LOCK_KEY)))).scalar()
+        if not locked:
+            return None
+        with telemetry.phase('db_read'):
+            db_objects = await DBSelector(session).get_menu_objects()
+        with telemetry.phase('diff'):
+            diff = diff_menu_objects(db_objects, (excel_menu, excel_submenu, excel_dish))
+        with telemetry.phase('write'):
+            await DBSync(session, diff, initial_load=not any(db_objects)).apply()
+        with telemetry.phase('pricing'):
+            pricing = await DishPricing(session, discount_index).update_pricing()
+        with telemetry.phase('counters'):
+            counters = await refresh_counters(session)
+        with telemetry.phase('commit'):
+            await session.commit()
+    invalidation.add_parents(db_objects, (excel_menu, excel_submenu, excel_dish))
+    invalidation.add_diff(diff)
+    invalidation.add_pricing(pricing)
+    invalidation.add_counters(*counters)
+    with telemetry.phase('invalidation'):
+        await invalidation.save_discount_index(discount_index)
+        invalidated_keys = await invalidation.invalidate()
+    telemetry.count(
+        menus=len(excel_menu),
+        submenus=len(excel_submenu),
+        dishes=len(excel_dish),
+        **{
+            f'{entity}_{action}': len(getattr(table_diff, action))
+            for entity, table_diff in (('menus', diff.menus), ('submenus', diff.submenus), ('dishes', diff.dishes))
+            for action in ('insert', 'update', 'delete')
+        },
+        pricing_updated=len(pricing),
+        counters_updated=sum(map(len, counters)),
+        invalidated_keys=invalidated_keys,
     )
-
-    await changer.check_db_change()
-    await updater.check_db_update()
+    return invalidated_keys
@@ -24,3 +24,37 @@ RABBITMQ_PASS = os.environ.get('RABBITMQ_PASS')
 
 REDIS_HOST = os.environ.get('REDIS_HOST')
 REDIS_PORT = os.environ.get('REDIS_PORT')
+REDIS_POOL_SIZE = int(os.environ.get('REDIS_POOL_SIZE', 50))
+REDIS_POOL_TIMEOUT = float(os.environ.get('REDIS_POOL_TIMEOUT', 5))
+REDIS_SOCKET_TIMEOUT = float(os.environ.get('REDIS_SOCKET_TIMEOUT', 5))
+REDIS_SOCKET_CONNECT_TIMEOUT = float(os.environ.get('REDIS_SOCKET_CONNECT_TIMEOUT', 2))
+
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+DB_USE_NULL_POOL = os.environ.get('DB_USE_NULL_POOL', 'false').lower() == 'true'
+
+CACHE_COMPRESSION = os.environ.get('CACHE_COMPRESSION', 'zlib')
+CACHE_COMPRESS_THRESHOLD = int(os.environ.get('CACHE_COMPRESS_THRESHOLD', 4096))
+CACHE_TTL = int(os.environ.get('CACHE_TTL', 3600))
+CACHE_VERSION_TTL = int(os.environ.get('CACHE_VERSION_TTL', 24 * 3600))
+
+LOCAL_CACHE_ENABLED = os.environ.get('LOCAL_CACHE_ENABLED', 'true').lower() == 'true'
+LOCAL_CACHE_MAX_BYTES = int(os.environ.get('LOCAL_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+LOCAL_CACHE_TTL = float(os.environ.get('LOCAL_CACHE_TTL', 30))
+
+CACHE_LOCK_ENABLED = os.environ.get('CACHE_LOCK_ENABLED', 'false').lower() == 'true'
+CACHE_LOCK_TIMEOUT = float(os.environ.get('CACHE_LOCK_TIMEOUT', 5))
+CACHE_LOCK_WAIT = float(os.environ.get('CACHE_LOCK_WAIT', 2))
+
+NESTED_MENUS_MODE = os.environ.get('NESTED_MENUS_MODE', 'json')
+
+SYNC_BATCH_SIZE = int(os.environ.get('SYNC_BATCH_SIZE', 5000))
+SYNC_USE_COPY = os.environ.get('SYNC_USE_COPY', 'true').lower() == 'true'
+SYNC_HASH_TTL = int(os.environ.get('SYNC_HASH_TTL', 300))
+SYNC_HISTORY_SIZE = int(os.environ.get('SYNC_HISTORY_SIZE', 100))
+
+SHEET_SOURCE = os.environ.get('SHEET_SOURCE', 'gspread')
+SHEET_XLSX_PATH = os.environ.get('SHEET_XLSX_PATH', 'admin/Menu.xlsx')
@@ -0,0 +1,89 @@
+"""Codec for cache payloads"""
+import zlib
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+
+from config import CACHE_COMPRESS_THRESHOLD, CACHE_COMPRESSION
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CACHE_FORMAT_VERSION = 2
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+
+
+def _default(obj: Any) -> Any:
+    """
+    Serialize pydantic schema as dict of raw field values
+    Field serializers are skipped, so values keep full precision
+    """
+    if isinstance(obj, BaseModel):
+        return dict(obj)
+    raise TypeError
+
+
+class CacheCodec:
+    """
+    Encode values to cache payload and decode them back
+    Payload: version byte, compression byte, orjson body
+    """
+
+    def __init__(
+            self,
+            compression: str = CACHE_COMPRESSION,
+            compress_threshold: int = CACHE_COMPRESS_THRESHOLD,
+    ) -> None:
+        self.compress_threshold = compress_threshold
+        self.compression = COMPRESSION_NONE
+        if compression == 'zlib':
+            self.compression = COMPRESSION_ZLIB
+        elif compression == 'zstd' and zstandard is not None:
+            self.compression = COMPRESSION_ZSTD
+
+    def _compress(self, body: bytes) -> tuple[int, bytes]:
+        """Compress body above threshold with configured algorithm"""
+        if len(body) < self.compress_threshold or self.compression == COMPRESSION_NONE:
+            return COMPRESSION_NONE, body
+        if self.compression == COMPRESSION_ZSTD:
+            return COMPRESSION_ZSTD, zstandard.ZstdCompressor().compress(body)
+        return COMPRESSION_ZLIB, zlib.compress(body, 1)
+
+    @staticmethod
+    def _decompress(compression: int, body: bytes) -> bytes | None:
+        """Decompress body, return None if algorithm is not available"""
+        if compression == COMPRESSION_NONE:
+            return body
+        if compression == COMPRESSION_ZLIB:
+            return zlib.decompress(body)
+        if compression == COMPRESSION_ZSTD and zstandard is not None:
+            return zstandard.ZstdDecompressor().decompress(body)
+        return None
+
+    def encode_bytes(self, body: bytes) -> bytes:
+        """Encode raw bytes to payload"""
+        compression, body = self._compress(body)
+        return bytes((CACHE_FORMAT_VERSION, compression)) + body
+
+    def decode_bytes(self, payload: bytes) -> bytes | None:
+        """Decode payload to raw bytes, return None for payload of other format version"""
+        if len(payload) < 2 or payload[0] != CACHE_FORMAT_VERSION:
+            return None
+        return self._decompress(payload[1], payload[2:])
+
+    def encode(self, value: Any) -> bytes:
+        """Encode schemas, lists and dicts to payload"""
+        return self.encode_bytes(orjson.dumps(value, default=_default))
+
+    def decode(self, payload: bytes) -> Any | None:
+        """Decode payload, return None for payload of other format version"""
+        body = self.decode_bytes(payload)
+        if body is None:
+            return None
+        return orjson.loads(body)
@@ -1,13 +1,76 @@
 """Cache repository"""
-import pickle
-from typing import Sequence
-from uuid import UUID
+import asyncio
+import hashlib
+import time
+from functools import lru_cache, partial
+from typing import Any, Awaitable, Callable, Sequence, cast
+from uuid import UUID, uuid4
 
+import orjson
 from fastapi import Depends
+from pydantic import BaseModel, TypeAdapter
 from redis.asyncio.client import Redis
-from sqlalchemy import Row, RowMapping
+from redis.exceptions import RedisError
+from starlette import status
+from starlette.responses import Response
 
-from db.database import get_redis_session
+from config import (
+    CACHE_LOCK_ENABLED,
+    CACHE_LOCK_TIMEOUT,
+    CACHE_LOCK_WAIT,
+    CACHE_TTL,
+    CACHE_VERSION_TTL,
+)
+from db.cache_codec import CacheCodec
+from db.database import get_redis_client, get_redis_session
+from db.local_cache import LocalCache
+from db.single_flight import SingleFlight
+
+cache_codec = CacheCodec()
+local_cache = LocalCache()
+single_flight = SingleFlight()
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+BUMP_VERSION_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2])
+local version = redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return version
+"""
+
+
+@lru_cache
+def get_type_adapter(response_model: Any) -> TypeAdapter:
+    """Return type adapter of response model, built once per model"""
+    return TypeAdapter(response_model)
+
+
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    """Check If-None-Match header contains etag, weak validators are compared by value"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return etag in (tag.strip().removeprefix('W/') for tag in if_none_match.split(','))
+
+
+async def render_response(
+        loader: Callable[[], Awaitable[Any]],
+        response_model: Any,
+) -> bytes:
+    """
+    Load value and render it to json bytes as response model serializes it
+    Without response model loader returns rendered json bytes
+    """
+    if response_model is None:
+        return await loader()
+    return get_type_adapter(response_model).dump_json(await loader(), by_alias=True)
 
 
 class CacheRepository:
@@ -21,59 +84,325 @@ class CacheRepository:
 
     async def get(
             self,
-            key: str
-    ) -> Sequence[Row] | RowMapping | list[dict] | None:
-        """Get value from redis"""
-        cache_value = await self.redis_session.get(name=key)
-        if not cache_value:
-            return None
-        return pickle.loads(cache_value)
+            key: str,
+            schema: type[BaseModel] | None = None,
+            raw: bool = False,
+    ) -> Any | None:
+        """
+        Get value from redis
+        If schema get rebuild schema or list of schemas from cached records
+        If raw get return cached bytes as is
+        """
+        cache_value = local_cache.get(key)
+        if cache_value is None:
+            generation = local_cache.generation
+            cache_value = await self.redis_session.get(name=key)
+            if not cache_value:
+                return None
+            local_cache.set(key, cache_value, generation)
+        if raw:
+            return cache_codec.decode_bytes(cache_value)
+        value = cache_codec.decode(cache_value)
+        if value is None or schema is None:
+            return value
+        if isinstance(value, list):
+            return [schema.model_validate(record) for record in value]
+        return schema.model_validate(value)
 
     async def set(
             self,
             key: str,
-            value: Sequence[Row],
+            value: BaseModel | Sequence[BaseModel] | list[dict] | dict | bytes,
+            raw: bool = False,
+            ttl: int | None = None,
             **kwargs
     ) -> None:
-        """Set value to redis use fast api bg task"""
-        await self.redis_session.set(name=key, value=pickle.dumps(value))
+        """
+        Set value to redis use fast api bg task
+        If raw set value is stored bytes, if ttl set key expires after ttl seconds
+        """
+        payload = cache_codec.encode_bytes(cast(bytes, value)) if raw else cache_codec.encode(value)
+        await self.redis_session.set(name=key, value=payload, ex=ttl)
+
+    async def get_or_set(
+            self,
+            key: str,
+            loader: Callable[[], Awaitable[Any]],
+            schema: type[BaseModel] | None = None,
+            raw: bool = False,
+            ttl: int | None = None,
+    ) -> Any:
+        """
+        Get value from cache or load it and set to cache
+        Concurrent misses of same key run only one loader in process
+        """
+        value = await self.get(key, schema, raw)
+        if value is not None:
+            return value
+        return await single_flight.do(key, lambda: self._load(key, loader, schema, raw, ttl))
+
+    async def get_or_set_response(
+            self,
+            key: str,
+            loader: Callable[[], Awaitable[Any]],
+            response_model: Any,
+            version_scope: str | None = None,
+            if_none_match: str | None = None,
+    ) -> Response:
+        """
+        Get json response rendered by response model from cache or load value, render and set it to cache
+        Cache hit returns stored bytes as is, without building schemas
+        With version scope response has ETag from scope version, matched If-None-Match gets 304 without body
+        Key embeds scope version, so bump of version is invalidation, keys of old versions expire by CACHE_TTL
+        """
+        headers = None
+        ttl = None
+        if version_scope is not None:
+            version = await self.get_version(version_scope)
+            etag = f'"{version_scope}-{version}"'
+            if etag_matches(etag, if_none_match):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+            headers = {'ETag': etag}
+            key = CacheMenuAppKeys.generate_generation_key(key, version_scope, version)
+            ttl = CACHE_TTL
+        content = await self.get_or_set(
+            key,
+            partial(render_response, loader, response_model),
+            raw=True,
+            ttl=ttl,
+        )
+        return Response(content=content, media_type='application/json', headers=headers)
+
+    async def get_or_set_parts_response(
+            self,
+            key: str,
+            part_ids_loader: Callable[[], Awaitable[list[str]]],
+            part_ids_scope: str,
+            part_scope: Callable[[str], str],
+            parts_loader: Callable[[list[str]], Awaitable[dict[str, bytes]]],
+            if_none_match: str | None = None,
+    ) -> Response:
+        """
+        Get json array response composed of cached parts, every part is cached in version of its own scope
+        Ids of parts are cached in version of part ids scope, missing parts are loaded by one loader call
+        ETag is built from ids and versions of parts, matched If-None-Match gets 304 without body
+        """
+        part_ids = await self.get_or_set(
+            CacheMenuAppKeys.generate_generation_key(key, part_ids_scope, await self.get_version(part_ids_scope)),
+            part_ids_loader,
+            ttl=CACHE_TTL,
+        )
+        part_scopes = [part_scope(part_id) for part_id in part_ids]
+        versions = await self.get_versions(part_scopes)
+        etag = '"{}-{}"'.format(key, hashlib.blake2b(
+            orjson.dumps([part_ids, versions]),
+            digest_size=8
+        ).hexdigest())
+        if etag_matches(etag, if_none_match):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        part_keys = {
+            part_id: CacheMenuAppKeys.generate_generation_key(
+                CacheMenuAppKeys.generate_key(key, part_id),
+                scope,
+                version
+            )
+            for part_id, scope, version in zip(part_ids, part_scopes, versions)
+        }
+        parts = {
+            part_id: cache_codec.decode_bytes(payload)
+            for part_id, payload in zip(part_keys, await self._get_payloads(list(part_keys.values())))
+            if payload
+        }
+        missing = [part_id for part_id in part_keys if part_id not in parts]
+        if missing:
+            missing_keys = {part_id: part_keys[part_id] for part_id in missing}
+            parts.update(await single_flight.do(
+                ','.join(missing_keys.values()),
+                lambda: self._load_parts(missing_keys, parts_loader)
+            ))
+        content = b'[' + b','.join(parts[part_id] for part_id in part_keys if part_id in parts) + b']'
+        return Response(content=content, media_type='application/json', headers={'ETag': etag})
+
+    async def _get_payloads(
+            self,
+            keys: list[str]
+    ) -> list[bytes | None]:
+        """Get raw payloads of keys from local cache, misses are read from redis by one MGET"""
+        payloads = [local_cache.get(key) for key in keys]
+        missing = [index for index, payload in enumerate(payloads) if payload is None]
+        if missing:
+            generation = local_cache.generation
+            for index, payload in zip(missing, await self.redis_session.mget([keys[index] for index in missing])):
+                if payload:
+                    payloads[index] = payload
+                    local_cache.set(keys[index], payload, generation)
+        return payloads
+
+    async def _load_parts(
+            self,
+            part_keys: dict[str, str],
+            parts_loader: Callable[[list[str]], Awaitable[dict[str, bytes]]],
+    ) -> dict[str, bytes]:
+        """Load parts by one loader call and set them to cache in one pipeline"""
+        loaded = await parts_loader(list(part_keys))
+        async with self.redis_session.pipeline(transaction=False) as pipe:
+            for part_id, content in loaded.items():
+                pipe.set(part_keys[part_id], cache_codec.encode_bytes(content), ex=CACHE_TTL)
+            await pipe.execute()
+        return loaded
+
+    async def get_version(
+            self,
+            scope: str
+    ) -> int:
+        """Get version of cache scope"""
+        return (await self.get_versions([scope]))[0]
 
-    async def delete(
+    async def get_versions(
             self,
-            keys: list[str],
+            scopes: Sequence[str]
+    ) -> list[int]:
+        """
+        Get versions of cache scopes from local cache, misses are read from redis by one MGET
+        Bumps publish version keys to invalidation channel, so local versions are fresh while worker listens it
+        Missing version starts from current time in microseconds and expires after CACHE_VERSION_TTL,
+        so version recreated after expiry or redis flush is greater than old one
+        """
+        if not scopes:
+            return []
+        version_keys = [CacheMenuAppKeys.generate_version_key(scope) for scope in scopes]
+        versions = await self._get_payloads(version_keys)
+        missing = [version_key for version_key, version in zip(version_keys, versions) if version is None]
+        if missing:
+            start_version = time.time_ns() // 1000
+            async with self.redis_session.pipeline(transaction=False) as pipe:
+                for version_key in missing:
+                    pipe.set(version_key, start_version, nx=True, ex=CACHE_VERSION_TTL)
+                await pipe.execute()
+            versions = await self._get_payloads(version_keys)
+        return [int(version or 0) for version in versions]
+
+    async def bump_versions(
+            self,
+            scopes: Sequence[str]
     ) -> None:
-        """Delete value from redis use fast api bg task"""
-        await self.redis_session.delete(*keys)
+        """
+        Increment versions of cache scopes in one pipeline, one INCR invalidates all keys of scope
+        Expiry of version is refreshed on every bump, bumped version keys are evicted from local caches of workers
+        Call it after commit of changes
+        """
+        if not scopes:
+            return
+        version_keys = [CacheMenuAppKeys.generate_version_key(scope) for scope in scopes]
+        async with self.redis_session.pipeline(transaction=False) as pipe:
+            for version_key in version_keys:
+                pipe.eval(
+                    BUMP_VERSION_SCRIPT,
+                    1,
+                    version_key,
+                    time.time_ns() // 1000,
+                    CACHE_VERSION_TTL,
+                )
+            await pipe.execute()
+        await self.invalidate_local(version_keys)
 
-    async def delete_by_pattern(
+    async def _load(
             self,
-            key: str
+            key: str,
+            loader: Callable[[], Awaitable[Any]],
+            schema: type[BaseModel] | None,
+            raw: bool,
+            ttl: int | None,
+    ) -> Any:
+        """
+        Load value and set it to cache
+        With cache lock enabled only lock owner loads, other workers wait value in cache
+        """
+        if not CACHE_LOCK_ENABLED:
+            value = await loader()
+            await self.set(key, value, raw, ttl)
+            return value
+
+        lock_key = CacheMenuAppKeys.generate_lock_key(key)
+        token = uuid4().hex
+        if not await self.redis_session.set(lock_key, token, nx=True, px=int(CACHE_LOCK_TIMEOUT * 1000)):
+            value = await self._wait_value(key, schema, raw)
+            if value is not None:
+                return value
+        try:
+            value = await loader()
+            await self.set(key, value, raw, ttl)
+            return value
+        finally:
+            await self.redis_session.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+    async def _wait_value(
+            self,
+            key: str,
+            schema: type[BaseModel] | None,
+            raw: bool,
+    ) -> Any | None:
+        """Wait value loaded by other worker, return None after wait timeout"""
+        deadline = time.monotonic() + CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            value = await self.get(key, schema, raw)
+            if value is not None:
+                return value
+        return None
+
+    async def invalidate_local(
+            self,
+            keys: Sequence[str]
     ) -> None:
-        """Delete value from redis by pattern"""
-        for key in await self.redis_session.keys(f'{key}*'):
-            await self.redis_session.delete(key)
+        """Evict keys from local cache of this worker and publish them for other workers"""
+        if not keys:
+            return
+        local_cache.evict(keys)
+        await self.redis_session.publish(
+            CacheMenuAppKeys.get_invalidation_channel(),
+            orjson.dumps(list(keys))
+        )
+
+
+async def listen_cache_invalidation() -> None:
+    """
+    Evict local cache keys published by any worker or celery sync
+    Local cache works only while subscription is alive
+    """
+    while True:
+        try:
+            async with get_redis_client().pubsub() as pubsub:
+                await pubsub.subscribe(CacheMenuAppKeys.get_invalidation_channel())
+                local_cache.enable()
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None:
+                        local_cache.evict(orjson.loads(message['data']))
+        except (RedisError, OSError):
+            await asyncio.sleep(1)
+        finally:
+            local_cache.disable()
 
 
 class CacheMenuAppKeys:
     """Class for cache named keys for menu app"""
 
     def __init__(self):
-        self.__list_common_key = 'list'
         self.__list_menus_key = 'list_menus'
         self.__list_submenus_key = 'list_submenus'
         self.__list_dishes_key = 'list_dishes'
         self.__list_menus__nested_key = 'list_menus_nested'
+        self.__list_menus__nested_json_key = 'list_menus_nested_json'
 
         self.__menu_key = 'menu'
         self.__submenu_key = 'submenu'
         self.__dish_key = 'dish'
 
-        self.__dish_discount_key = 'dish_discount_key'
+        self.__dish_discount_key = 'dish_discount_index'
 
-    @property
-    def get_list_common_key(self) -> str:
-        """get cache name key for list menus"""
-        return self.__list_common_key
+        self.__catalog_key = 'catalog'
 
     @property
     def get_list_menus_key(self) -> str:
@@ -85,6 +414,11 @@ class CacheMenuAppKeys:
         """get cache name key for list menus"""
         return self.__list_menus__nested_key
 
+    @property
+    def get_list_menus_nested_json_key(self) -> str:
+        """get cache name key for list menus rendered by database"""
+        return self.__list_menus__nested_json_key
+
     @property
     def get_list_submenus_key(self) -> str:
         """get cache name key for list submenus"""
@@ -110,12 +444,37 @@ class CacheMenuAppKeys:
         """get cache name key for list dishes"""
         return self.__dish_key
 
+    @property
+    def get_catalog_key(self) -> str:
+        """get cache scope name of whole catalog for version"""
+        return self.__catalog_key
+
     @property
     def get_dish_discount_key(self) -> str:
-        """get cache name key for list dishes"""
+        """get cache name key for discount index dish title -> discount"""
         return self.__dish_discount_key
 
     @staticmethod
-    def generate_key(key: str, identifier: UUID) -> str:
+    def generate_key(key: str, identifier: UUID | str) -> str:
         """Generate key for redis key cache"""
         return f'{key}_{identifier}'
+
+    @staticmethod
+    def get_invalidation_channel() -> str:
+        """get redis pub/sub channel for local cache invalidation"""
+        return 'cache_invalidation'
+
+    @staticmethod
+    def generate_lock_key(key: str) -> str:
+        """Generate key for redis lock of loading cache key"""
+        return f'lock_{key}'
+
+    @staticmethod
+    def generate_version_key(scope: str) -> str:
+        """Generate key for redis counter with version of cache scope"""
+        return f'version_{scope}'
+
+    @staticmethod
+    def generate_generation_key(key: str, scope: str, version: int) -> str:
+        """Generate key for redis key cache in version of cache scope"""
+        return f'{key}@{scope}:{version}'
@@ -1,36 +1,194 @@
 """
 Create async connection to database
 """
-from typing import AsyncGenerator
+import asyncio
+from typing import AsyncGenerator, TypedDict
 
-from redis import asyncio as aioredis
+from redis.asyncio import BlockingConnectionPool, ConnectionPool
 from redis.asyncio.client import Redis
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import NullPool, QueuePool
 
-from config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER, REDIS_HOST, REDIS_PORT
+from config import (
+    DB_HOST,
+    DB_MAX_OVERFLOW,
+    DB_NAME,
+    DB_PASS,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_PORT,
+    DB_USE_NULL_POOL,
+    DB_USER,
+    REDIS_HOST,
+    REDIS_POOL_SIZE,
+    REDIS_POOL_TIMEOUT,
+    REDIS_PORT,
+    REDIS_SOCKET_CONNECT_TIMEOUT,
+    REDIS_SOCKET_TIMEOUT,
+)
 
 DATABASE_URL = f'postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+REDIS_URL = f'redis://{REDIS_HOST}:{REDIS_PORT}/0'
 
+engine: AsyncEngine | None = None
+async_session_maker: async_sessionmaker[AsyncSession] | None = None
 
-engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
-async_session_maker = async_sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False)
+redis_pool: ConnectionPool | None = None
+redis_pool_loop: asyncio.AbstractEventLoop | None = None
+
+
+class EnginePoolStats(TypedDict):
+    """Usage stats of shared engine pool"""
+    pool_class: str
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+
+
+class RedisPoolStats(TypedDict):
+    """Usage stats of shared redis pool"""
+    max_connections: int
+    in_use_connections: int
+    available_connections: int
+
+
+def build_engine(
+        database_url: str = DATABASE_URL,
+        use_null_pool: bool = DB_USE_NULL_POOL
+) -> AsyncEngine:
+    """
+    Create async engine with connection pool settings from config
+    NullPool opens new connection for every session, use it for tests
+    """
+    if use_null_pool:
+        return create_async_engine(database_url, poolclass=NullPool)
+    return create_async_engine(
+        database_url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+
+
+def get_session_maker(use_null_pool: bool = DB_USE_NULL_POOL) -> async_sessionmaker[AsyncSession]:
+    """Return session maker bound to engine shared by process, create them if not exists"""
+    global engine, async_session_maker
+    if async_session_maker is None:
+        engine = build_engine(use_null_pool=use_null_pool)
+        async_session_maker = async_sessionmaker(
+            bind=engine,
+            class_=AsyncSession,
+            expire_on_commit=False)
+    return async_session_maker
+
+
+async def dispose_engine() -> None:
+    """Close all pooled connections of shared engine"""
+    global engine, async_session_maker
+    if engine is not None:
+        await engine.dispose()
+    engine = None
+    async_session_maker = None
+
+
+def get_engine_pool_stats() -> EnginePoolStats:
+    """Return usage stats of shared engine pool"""
+    pool = engine.pool if engine is not None else None
+    if not isinstance(pool, QueuePool):
+        return {
+            'pool_class': type(pool).__name__,
+            'size': 0,
+            'checked_in': 0,
+            'checked_out': 0,
+            'overflow': 0,
+        }
+    return {
+        'pool_class': type(pool).__name__,
+        'size': pool.size(),
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+    }
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """
     create async session maker and return session object
     """
-    async with async_session_maker() as session:
+    async with get_session_maker()() as session:
         yield session
 
 
+def get_redis_pool() -> ConnectionPool:
+    """
+    Return redis connection pool shared by process
+    Pool connections are bound to event loop, so new loop gets new pool
+    """
+    global redis_pool, redis_pool_loop
+    loop = asyncio.get_running_loop()
+    if redis_pool is None or redis_pool_loop is not loop:
+        redis_pool = BlockingConnectionPool.from_url(
+            REDIS_URL,
+            max_connections=REDIS_POOL_SIZE,
+            timeout=REDIS_POOL_TIMEOUT,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_SOCKET_CONNECT_TIMEOUT,
+        )
+        redis_pool_loop = loop
+    return redis_pool
+
+
+async def close_redis_pool() -> None:
+    """Disconnect all connections of shared redis pool"""
+    global redis_pool, redis_pool_loop
+    if redis_pool is not None:
+        await redis_pool.disconnect()
+    redis_pool = None
+    redis_pool_loop = None
+
+
+def count_pool_connections(pool: ConnectionPool, name: str) -> int:
+    """
+    Count connections of redis pool by name of its internal collection
+    redis has no public api for pool usage, missing collection is counted as 0
+    """
+    connections = getattr(pool, name, None)
+    return len(connections) if connections is not None else 0
+
+
+def get_redis_pool_stats() -> RedisPoolStats:
+    """Return usage stats of shared redis pool"""
+    if redis_pool is None:
+        return {
+            'max_connections': REDIS_POOL_SIZE,
+            'in_use_connections': 0,
+            'available_connections': 0,
+        }
+    return {
+        'max_connections': redis_pool.max_connections,
+        'in_use_connections': count_pool_connections(redis_pool, '_in_use_connections'),
+        'available_connections': count_pool_connections(redis_pool, '_available_connections'),
+    }
+
+
+def get_redis_client() -> Redis:
+    """Return redis client use shared connection pool"""
+    return Redis(connection_pool=get_redis_pool())
+
+
 async def get_redis_session() -> AsyncGenerator[Redis, None]:
     """
-    create async session maker and return session object with Redis connection
+    return Redis client object with connection from shared pool
     """
-    async with aioredis.from_url(f'redis://{REDIS_HOST}:{REDIS_PORT}/0') as redis_session:
+    async with get_redis_client() as redis_session:
         yield redis_session
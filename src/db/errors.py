@@ -0,0 +1,9 @@
+"""Database errors mapped by postgres sqlstate"""
+from sqlalchemy.exc import IntegrityError
+
+UNIQUE_VIOLATION = '23505'
+
+
+def is_unique_violation(error: IntegrityError) -> bool:
+    """Check integrity error is violation of unique constraint"""
+    return getattr(error.orig, 'sqlstate', None) == UNIQUE_VIOLATION
@@ -0,0 +1,79 @@
+"""In-process cache tier in front of redis"""
+import time
+from collections import OrderedDict
+from typing import Iterable
+
+from config import LOCAL_CACHE_MAX_BYTES, LOCAL_CACHE_TTL
+
+
+class LocalCache:
+    """
+    LRU cache of raw cache payloads with TTL and bounded size in bytes
+    Works only while worker listens invalidation channel, else every get is miss
+    """
+
+    def __init__(
+            self,
+            max_bytes: int = LOCAL_CACHE_MAX_BYTES,
+            ttl: float = LOCAL_CACHE_TTL,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = False
+        self.generation = 0
+        self._size = 0
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    def enable(self) -> None:
+        """Enable cache after subscribe to invalidation channel"""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Disable and clear cache when invalidation channel is lost"""
+        self.enabled = False
+        self.clear()
+
+    def _pop(self, key: str) -> None:
+        """Remove entry and release its size"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+
+    def get(self, key: str) -> bytes | None:
+        """Get payload if exists and not expired"""
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: str, payload: bytes, generation: int) -> None:
+        """
+        Set payload read from redis
+        Skip it if any invalidation happened after read started
+        """
+        if not self.enabled or generation != self.generation or len(payload) > self.max_bytes:
+            return
+        self._pop(key)
+        self._entries[key] = (time.monotonic() + self.ttl, payload)
+        self._size += len(payload)
+        while self._size > self.max_bytes:
+            _, (_, old_payload) = self._entries.popitem(last=False)
+            self._size -= len(old_payload)
+
+    def evict(self, keys: Iterable[str]) -> None:
+        """Evict keys"""
+        self.generation += 1
+        for key in keys:
+            self._pop(key)
+
+    def clear(self) -> None:
+        """Evict all keys"""
+        self.generation += 1
+        self._entries.clear()
+        self._size = 0
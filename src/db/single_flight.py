@@ -0,0 +1,42 @@
+"""Coalesce concurrent loads of same key"""
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class SingleFlight:
+    """
+    Run only one loader per key at a time in process
+    Concurrent callers of same key await result of running loader
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, asyncio.Future] = {}
+
+    async def do(
+            self,
+            key: str,
+            loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run loader or await result of loader already running for key"""
+        future = self._calls.get(key)
+        if future is not None:
+            await asyncio.wait([future])
+            if future.cancelled():
+                return await self.do(key, loader)
+            return future.result()
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()
+            raise
+        finally:
+            self._calls.pop(key, None)
+        future.set_result(result)
+        return result
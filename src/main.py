@@ -1,15 +1,42 @@
 """main endpoint"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
 
 from fastapi import FastAPI
 
+from admin_app import admin_router
+from config import LOCAL_CACHE_ENABLED
+from db.cache_repo import listen_cache_invalidation
+from db.database import (
+    close_redis_pool,
+    dispose_engine,
+    get_redis_pool,
+    get_session_maker,
+)
 from menu_app.dish import dish_router
 from menu_app.menu import menu_router
 from menu_app.submenu import submenu_router
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    """Create shared connection pools on startup and close them on shutdown"""
+    get_session_maker()
+    get_redis_pool()
+    listener = asyncio.create_task(listen_cache_invalidation()) if LOCAL_CACHE_ENABLED else None
+    yield
+    if listener is not None:
+        listener.cancel()
+    await close_redis_pool()
+    await dispose_engine()
+
+
 app = FastAPI(
     title='Menu App',
     description='Menu App for CRUD operations',
     version='3.1.0',
+    lifespan=lifespan,
     openapi_tags=[
         {
             'name': 'Menu',
@@ -23,9 +50,14 @@ app = FastAPI(
             'name': 'Dish',
             'description': 'Dish CRUD',
         },
+        {
+            'name': 'Admin',
+            'description': 'Service state',
+        },
     ]
 )
 
 app.include_router(menu_router.menu_router)
 app.include_router(submenu_router.submenu_router)
 app.include_router(dish_router.dish_router)
+app.include_router(admin_router.admin_router)
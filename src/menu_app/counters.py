@@ -0,0 +1,118 @@
+"""
+Denormalized counters of menu and submenu
+Check and fix counters from command line:
+    cd src && python -m menu_app.counters [--fix]
+"""
+import argparse
+import asyncio
+from uuid import UUID
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.cache_repo import CacheRepository
+from db.database import (
+    close_redis_pool,
+    dispose_engine,
+    get_redis_client,
+    get_session_maker,
+)
+from menu_app.invalidation import InvalidationPlanner
+from menu_app.models import Dish, Menu, Submenu
+
+
+def _submenu_dishes_count():
+    """Subquery of actual dishes count for submenu"""
+    return select(func.count(Dish.id)).where(Dish.submenu_id == Submenu.id).scalar_subquery()
+
+
+def _menu_submenus_count():
+    """Subquery of actual submenus count for menu"""
+    return select(func.count(Submenu.id)).where(Submenu.menu_id == Menu.id).scalar_subquery()
+
+
+def _menu_dishes_count():
+    """Subquery of actual dishes count for menu"""
+    return (
+        select(func.count(Dish.id))
+        .join(Submenu, Submenu.id == Dish.submenu_id)
+        .where(Submenu.menu_id == Menu.id)
+        .scalar_subquery()
+    )
+
+
+async def find_counter_mismatches(session: AsyncSession) -> list[dict]:
+    """Find menus and submenus with counters different from actual rows count"""
+    submenus = (await session.execute(
+        select(Submenu.id, Submenu.dishes_count, _submenu_dishes_count().label('actual_dishes_count'))
+        .where(Submenu.dishes_count != _submenu_dishes_count())
+    )).mappings().all()
+    menus = (await session.execute(
+        select(
+            Menu.id,
+            Menu.submenus_count,
+            Menu.dishes_count,
+            _menu_submenus_count().label('actual_submenus_count'),
+            _menu_dishes_count().label('actual_dishes_count'),
+        )
+        .where(or_(
+            Menu.submenus_count != _menu_submenus_count(),
+            Menu.dishes_count != _menu_dishes_count(),
+        ))
+    )).mappings().all()
+    return [{'table': 'menu', **menu} for menu in menus] + [{'table': 'submenu', **submenu} for submenu in submenus]
+
+
+async def refresh_counters(session: AsyncSession) -> tuple[list[UUID], list[UUID]]:
+    """
+    Recompute counters of menus and submenus from actual rows
+    Only rows with wrong counters are updated, return ids of updated menus and submenus
+    Session is not committed
+    """
+    submenus = await session.execute(
+        update(Submenu)
+        .where(Submenu.dishes_count != _submenu_dishes_count())
+        .values(dishes_count=_submenu_dishes_count())
+        .returning(Submenu.id)
+    )
+    submenu_ids = submenus.scalars().all()
+    menus = await session.execute(
+        update(Menu)
+        .where(or_(
+            Menu.submenus_count != _menu_submenus_count(),
+            Menu.dishes_count != _menu_dishes_count(),
+        ))
+        .values(submenus_count=_menu_submenus_count(), dishes_count=_menu_dishes_count())
+        .returning(Menu.id)
+    )
+    return list(menus.scalars().all()), list(submenu_ids)
+
+
+async def check_counters(fix: bool) -> int:
+    """Print counters mismatches and fix them if need, return count mismatches"""
+    try:
+        async with get_session_maker()() as session:
+            mismatches = await find_counter_mismatches(session)
+            for mismatch in mismatches:
+                print(mismatch)
+            if fix and mismatches:
+                menu_ids, submenu_ids = await refresh_counters(session)
+                print(f'fixed rows: {len(menu_ids) + len(submenu_ids)}')
+                await session.commit()
+                planner = InvalidationPlanner()
+                async with get_redis_client() as redis_session:
+                    await CacheRepository(redis_session).bump_versions([
+                        *(planner.menu_scope(menu_id) for menu_id in menu_ids),
+                        *(planner.submenu_scope(submenu_id) for submenu_id in submenu_ids),
+                    ])
+        return len(mismatches)
+    finally:
+        await close_redis_pool()
+        await dispose_engine()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check counters of menus and submenus')
+    parser.add_argument('--fix', action='store_true', help='recompute wrong counters')
+    args = parser.parse_args()
+    raise SystemExit(1 if asyncio.run(check_counters(args.fix)) and not args.fix else 0)
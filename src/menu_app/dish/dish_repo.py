@@ -1,18 +1,21 @@
 """Dish Repository Pattern"""
 from typing import Sequence
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from fastapi import Depends
-from sqlalchemy import Row, RowMapping, delete, insert, select, update
+from sqlalchemy import CTE, Row, RowMapping, delete, insert, literal, select, update
 from sqlalchemy.engine import Result
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.responses import JSONResponse
 
 from db.database import get_async_session
+from db.errors import is_unique_violation
 from menu_app.dish.dish_exceptions import DishExceptions
-from menu_app.models import Dish
+from menu_app.models import Dish, Menu, Submenu
 from menu_app.schemas import DishCreateSchema, DishReadSchema
-from menu_app.submenu.submenu_service import SubmenuRepository
+from menu_app.submenu.submenu_exceptions import SubmenuExceptions
+from menu_app.utils import DishConverter
 
 
 class DishRepository:
@@ -21,38 +24,60 @@ class DishRepository:
     def __init__(
             self,
             session: AsyncSession = Depends(get_async_session),
-            submenu_repo: SubmenuRepository = Depends(),
+            submenu_exceptions: SubmenuExceptions = Depends(),
             dish_exceptions: DishExceptions = Depends()
     ) -> None:
         self.session = session
-        self.submenu_repo = submenu_repo
+        self.submenu_exceptions = submenu_exceptions
         self.dish_exceptions = dish_exceptions
 
     async def if_dish_exists(
             self,
-            dish_id: UUID
+            dish_id: UUID,
+            submenu_id: UUID | None = None
     ) -> RowMapping:
-        """Check if dish exists with get dish_id"""
-        record: Result = await self.session.execute(
-            select(Dish).where(Dish.id == dish_id)
-        )
+        """Check if dish exists with get dish_id, in submenu with submenu_id if set"""
+        query = select(Dish).where(Dish.id == dish_id)
+        if submenu_id is not None:
+            query = query.where(Dish.submenu_id == submenu_id)
+        record: Result = await self.session.execute(query)
         result = record.mappings().first()
         if not result:
             await self.dish_exceptions.dish_not_found_exception()
         return result
 
-    async def check_dish_unique(
-            self,
-            title: str
-    ) -> Row:
-        """Check dish title unique"""
-        record: Result = await self.session.execute(
-            select(Dish).where(Dish.title == title)
-        )
-        result = record.scalars().first()
-        if result:
+    async def commit_unique_title(self) -> None:
+        """
+        Commit session, unique title is checked by deferred constraint on commit
+        Violation is rolled back and raised as dish title exists exception
+        """
+        try:
+            await self.session.commit()
+        except IntegrityError as error:
+            await self.session.rollback()
+            if not is_unique_violation(error):
+                raise
             await self.dish_exceptions.dish_title_exists_exception()
-        return result
+
+    @staticmethod
+    def count_menu_dishes(submenu: CTE, delta: int) -> CTE:
+        """CTE changing dishes_count of menu of submenu returned by submenu CTE"""
+        return (
+            update(Menu)
+            .where(Menu.id == submenu.c.menu_id)
+            .values(dishes_count=Menu.dishes_count + delta)
+            .returning(Menu.id)
+            .cte('counted_menu')
+        )
+
+    @staticmethod
+    def in_submenu(menu_id: UUID, submenu_id: UUID):
+        """Condition dish belongs to submenu_id of menu_id"""
+        return Dish.submenu_id == (
+            select(Submenu.id)
+            .where(Submenu.id == submenu_id, Submenu.menu_id == menu_id)
+            .scalar_subquery()
+        )
 
     async def get_all_dishes(
             self,
@@ -67,67 +92,108 @@ class DishRepository:
 
     async def create_dish(
             self,
+            menu_id: UUID,
             submenu_id: UUID,
-            dish_payload: DishCreateSchema
+            dish_payload: DishCreateSchema,
+            discount_index: dict[str, str] | None = None
     ) -> DishReadSchema:
         """
-        Create new dish
-        Only if submenu exists and new title dish unique
+        Create new dish by one statement
+        Submenu and menu counters are updated in CTE, dish is inserted only if submenu of menu was updated
+        Title is checked by unique constraint
         """
-        await self.submenu_repo.if_submenu_exists(submenu_id=submenu_id)
-
-        dish_payload_dict = dish_payload.model_dump()
-        await self.check_dish_unique(title=dish_payload_dict.get('title'))
-        dish_payload_dict.update({'submenu_id': submenu_id})
+        submenu = (
+            update(Submenu)
+            .where(Submenu.id == submenu_id, Submenu.menu_id == menu_id)
+            .values(dishes_count=Submenu.dishes_count + 1)
+            .returning(Submenu.id, Submenu.menu_id)
+            .cte('counted_submenu')
+        )
+        dish_values = {'id': uuid4(), **dish_payload.model_dump()}
+        dish_values.update(await DishConverter.return_dish_pricing(
+            dish_payload.title, dish_payload.price, discount_index
+        ))
         result: Result = await self.session.execute(
             insert(Dish)
-            .values(
-                dish_payload_dict
+            .from_select(
+                [*dish_values, 'submenu_id'],
+                select(*(literal(value) for value in dish_values.values()), submenu.c.id)
             )
+            .add_cte(self.count_menu_dishes(submenu, 1))
             .returning(Dish)
         )
-        await self.session.commit()
-        return result.scalars().first()
+        dish = result.scalars().first()
+        if dish is None:
+            await self.submenu_exceptions.submenu_not_found_exception()
+        await self.commit_unique_title()
+        return dish
 
     async def get_dish(
             self,
+            submenu_id: UUID,
             dish_id: UUID
     ) -> RowMapping:
-        """Get dish by id"""
-        return await self.if_dish_exists(dish_id)
+        """Get dish by id in submenu"""
+        return await self.if_dish_exists(dish_id, submenu_id)
 
     async def update_dish(
             self,
+            menu_id: UUID,
+            submenu_id: UUID,
             dish_id: UUID,
-            dish_payload: DishCreateSchema
+            dish_payload: DishCreateSchema,
+            discount_index: dict[str, str] | None = None
     ) -> DishReadSchema:
-        """Update dish by id"""
-        await self.if_dish_exists(dish_id=dish_id)
+        """Update dish by id in submenu of menu, no updated rows means dish not found"""
         dish_payload_dict = dish_payload.model_dump()
-        await self.check_dish_unique(title=dish_payload_dict.get('title'))
+        dish_payload_dict.update(await DishConverter.return_dish_pricing(
+            dish_payload.title, dish_payload.price, discount_index
+        ))
         result: Result = await self.session.execute(
             update(Dish)
             .where(
-                Dish.id == dish_id
+                Dish.id == dish_id,
+                self.in_submenu(menu_id, submenu_id)
             )
             .values(dish_payload_dict)
             .returning(Dish)
         )
-        await self.session.commit()
-        return result.scalars().first()
+        dish = result.scalars().first()
+        if dish is None:
+            await self.dish_exceptions.dish_not_found_exception()
+        await self.commit_unique_title()
+        return dish
 
     async def delete_dish(
             self,
+            menu_id: UUID,
+            submenu_id: UUID,
             dish_id: UUID
     ) -> JSONResponse:
-        """Delete dish by id"""
-        await self.if_dish_exists(dish_id)
-        await self.session.execute(
+        """
+        Delete dish by id in submenu of menu and update submenu and menu counters by one statement
+        No updated menu means dish not found
+        """
+        dish = (
             delete(Dish)
             .where(
-                Dish.id == dish_id
+                Dish.id == dish_id,
+                self.in_submenu(menu_id, submenu_id)
             )
+            .returning(Dish.submenu_id)
+            .cte('deleted_dish')
+        )
+        submenu = (
+            update(Submenu)
+            .where(Submenu.id == dish.c.submenu_id)
+            .values(dishes_count=Submenu.dishes_count - 1)
+            .returning(Submenu.menu_id)
+            .cte('counted_submenu')
         )
+        menu = self.count_menu_dishes(submenu, -1)
+        result: Result = await self.session.execute(select(menu.c.id))
+        if result.scalar_one_or_none() is None:
+            await self.dish_exceptions.dish_not_found_exception()
         await self.session.commit()
         return JSONResponse(
             content={'message': 'Success dish delete'}
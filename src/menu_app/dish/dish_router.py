@@ -1,9 +1,9 @@
 """DIsh api routers"""
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Header
 from starlette import status
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
 from menu_app.dish.dish_open_api_builder import DishOpenApiBuilder
 from menu_app.dish.dish_service import DishService
@@ -31,13 +31,15 @@ dish_router = APIRouter(
 )
 async def list_dishes(
         submenu_id: UUID,
+        if_none_match: str | None = Header(default=None),
         dish_service: DishService = Depends()
-) -> list[DishReadWithDiscountSchema]:
+) -> Response:
     """
     List dishes
     """
     return await dish_service.get_all_dishes(
-        submenu_id=submenu_id
+        submenu_id=submenu_id,
+        if_none_match=if_none_match
     )
 
 
@@ -53,6 +55,7 @@ async def list_dishes(
     )
 )
 async def create_dish(
+        menu_id: UUID,
         submenu_id: UUID,
         payload: DishCreateSchema,
         background_tasks: BackgroundTasks,
@@ -63,6 +66,7 @@ async def create_dish(
     """
     return await dish_service.create_dish(
         dish_payload=payload,
+        menu_id=menu_id,
         submenu_id=submenu_id,
         background_tasks=background_tasks,
     )
@@ -77,14 +81,18 @@ async def create_dish(
     responses=DishOpenApiBuilder.get_dish_not_found_404_response()
 )
 async def get_dish(
+        submenu_id: UUID,
         dish_id: UUID,
+        if_none_match: str | None = Header(default=None),
         dish_service: DishService = Depends()
-) -> DishReadWithDiscountSchema:
+) -> Response:
     """
     Get dish
     """
     return await dish_service.get_dish(
-        dish_id=dish_id
+        submenu_id=submenu_id,
+        dish_id=dish_id,
+        if_none_match=if_none_match
     )
 
 
@@ -100,6 +108,8 @@ async def get_dish(
     )
 )
 async def update_dish(
+        menu_id: UUID,
+        submenu_id: UUID,
         dish_id: UUID,
         payload: DishCreateSchema,
         background_tasks: BackgroundTasks,
@@ -109,6 +119,8 @@ async def update_dish(
     Update dish
     """
     return await dish_service.update_dish(
+        menu_id=menu_id,
+        submenu_id=submenu_id,
         dish_id=dish_id,
         dish_payload=payload,
         background_tasks=background_tasks,
@@ -1,11 +1,13 @@
 """DIsh service layer"""
+from functools import partial
 from uuid import UUID
 
 from fastapi import BackgroundTasks, Depends
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
 from db.cache_repo import CacheMenuAppKeys, CacheRepository
 from menu_app.dish.dish_repo import DishRepository
+from menu_app.invalidation import InvalidationPlanner
 from menu_app.schemas import (
     DishCreateSchema,
     DishReadSchema,
@@ -21,38 +23,46 @@ class DishService:
             self,
             dish_repo: DishRepository = Depends(),
             dish_cache: CacheRepository = Depends(),
-            menu_app_name_keys: CacheMenuAppKeys = Depends()
+            menu_app_name_keys: CacheMenuAppKeys = Depends(),
+            invalidation_planner: InvalidationPlanner = Depends()
     ) -> None:
         self.dish_repo = dish_repo
         self.dish_cache = dish_cache
         self.menu_app_name_keys = menu_app_name_keys
+        self.invalidation_planner = invalidation_planner
 
-    async def get_all_dishes(
+    async def _load_all_dishes(
             self,
             submenu_id: UUID
     ) -> list[DishReadWithDiscountSchema]:
+        """Load list dishes from db"""
+        return await DishConverter.convert_dish_sequence_to_list_dish(
+            await self.dish_repo.get_all_dishes(
+                submenu_id=submenu_id
+            )
+        )
+
+    async def get_all_dishes(
+            self,
+            submenu_id: UUID,
+            if_none_match: str | None = None
+    ) -> Response:
         """Get list dishes"""
         list_dishes_key = self.menu_app_name_keys.generate_key(
             self.menu_app_name_keys.get_list_dishes_key,
             submenu_id
         )
-        cache_list_dishes = await self.dish_cache.get(list_dishes_key)
-        dishes_discount = await self.dish_cache.get(self.menu_app_name_keys.get_dish_discount_key)
-        if cache_list_dishes is not None:
-            return await DishConverter.convert_dish_sequence_to_list_dish(
-                cache_list_dishes, dishes_discount
-            )
-
-        list_dishes = await self.dish_repo.get_all_dishes(
-            submenu_id=submenu_id
-        )
-        await self.dish_cache.set(list_dishes_key, list_dishes)
-        return await DishConverter.convert_dish_sequence_to_list_dish(
-            list_dishes, dishes_discount
+        return await self.dish_cache.get_or_set_response(
+            list_dishes_key,
+            partial(self._load_all_dishes, submenu_id),
+            list[DishReadWithDiscountSchema],
+            version_scope=self.invalidation_planner.submenu_scope(submenu_id),
+            if_none_match=if_none_match,
         )
 
     async def create_dish(
             self,
+            menu_id: UUID,
             submenu_id: UUID,
             dish_payload: DishCreateSchema,
             background_tasks: BackgroundTasks
@@ -60,61 +70,68 @@ class DishService:
         """Create dish"""
         dish = await self.dish_repo.create_dish(
             dish_payload=dish_payload,
-            submenu_id=submenu_id
+            menu_id=menu_id,
+            submenu_id=submenu_id,
+            discount_index=await self.dish_cache.get(self.menu_app_name_keys.get_dish_discount_key)
         )
         background_tasks.add_task(
-            self.dish_cache.delete_by_pattern,
-            self.menu_app_name_keys.get_list_dishes_key
+            self.dish_cache.bump_versions,
+            self.invalidation_planner.dish_changed(menu_id, submenu_id)
         )
-        background_tasks.add_task(self.dish_cache.delete, [
-            self.menu_app_name_keys.get_list_menus_nested_key,
-        ])
         return dish
 
-    async def get_dish(
+    async def _load_dish(
             self,
+            submenu_id: UUID,
             dish_id: UUID
     ) -> DishReadWithDiscountSchema:
+        """Load dish by id in submenu from db"""
+        return await DishConverter.convert_dish_row_to_schema(
+            await self.dish_repo.get_dish(
+                submenu_id=submenu_id,
+                dish_id=dish_id
+            )
+        )
+
+    async def get_dish(
+            self,
+            submenu_id: UUID,
+            dish_id: UUID,
+            if_none_match: str | None = None
+    ) -> Response:
         """Get dish by id"""
         dish_key = self.menu_app_name_keys.generate_key(
             self.menu_app_name_keys.get_dish_key,
             dish_id
         )
-        dishes_discount = await self.dish_cache.get(self.menu_app_name_keys.get_dish_discount_key)
-        cache_dish = await self.dish_cache.get(dish_key)
-        if cache_dish is not None:
-            return await DishConverter.convert_dish_row_to_schema(cache_dish, dishes_discount)
-
-        dish = await self.dish_repo.get_dish(
-            dish_id=dish_id
+        return await self.dish_cache.get_or_set_response(
+            dish_key,
+            partial(self._load_dish, submenu_id, dish_id),
+            DishReadWithDiscountSchema,
+            version_scope=self.invalidation_planner.submenu_scope(submenu_id),
+            if_none_match=if_none_match,
         )
-        await self.dish_cache.set(dish_key, dish)
-        return await DishConverter.convert_dish_row_to_schema(dish, dishes_discount)
 
     async def update_dish(
             self,
+            menu_id: UUID,
+            submenu_id: UUID,
             dish_id: UUID,
             dish_payload: DishCreateSchema,
             background_tasks: BackgroundTasks
     ) -> DishReadSchema:
         """Update dish by id"""
         dish = await self.dish_repo.update_dish(
+            menu_id=menu_id,
+            submenu_id=submenu_id,
             dish_id=dish_id,
-            dish_payload=dish_payload
-        )
-        dish_key = self.menu_app_name_keys.generate_key(
-            self.menu_app_name_keys.get_dish_key,
-            dish_id
+            dish_payload=dish_payload,
+            discount_index=await self.dish_cache.get(self.menu_app_name_keys.get_dish_discount_key)
         )
-
         background_tasks.add_task(
-            self.dish_cache.delete_by_pattern,
-            self.menu_app_name_keys.get_list_dishes_key
+            self.dish_cache.bump_versions,
+            self.invalidation_planner.dish_changed(menu_id, submenu_id)
         )
-        background_tasks.add_task(self.dish_cache.delete, [
-            self.menu_app_name_keys.get_list_menus_nested_key,
-            dish_key,
-        ])
         return dish
 
     async def delete_dish(
@@ -126,29 +143,12 @@ class DishService:
     ) -> JSONResponse:
         """Delete dish by id"""
         response = await self.dish_repo.delete_dish(
+            menu_id=menu_id,
+            submenu_id=submenu_id,
             dish_id=dish_id
         )
-        menu_key = self.menu_app_name_keys.generate_key(
-            self.menu_app_name_keys.get_menu_key,
-            menu_id
-        )
-        submenu_key = self.menu_app_name_keys.generate_key(
-            self.menu_app_name_keys.get_submenu_key,
-            submenu_id
-        )
-        dish_key = self.menu_app_name_keys.generate_key(
-            self.menu_app_name_keys.get_dish_key,
-            dish_id
-        )
-
         background_tasks.add_task(
-            self.dish_cache.delete_by_pattern,
-            self.menu_app_name_keys.get_list_dishes_key
+            self.dish_cache.bump_versions,
+            self.invalidation_planner.dish_changed(menu_id, submenu_id)
         )
-        background_tasks.add_task(self.dish_cache.delete, [
-            self.menu_app_name_keys.get_list_menus_nested_key,
-            menu_key,
-            submenu_key,
-            dish_key,
-        ])
         return response
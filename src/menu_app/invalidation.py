@@ -0,0 +1,56 @@
+"""
+Cache scopes of menu -> submenu -> dish hierarchy
+Every cached read belongs to one scope, write bumps versions of scopes it changes:
+    catalog - list menus and order of menus in nested tree
+    menu_{id} - menu with counters and its slice of nested tree
+    list_submenus_{menu_id} - list submenus of menu
+    submenu_{id} - submenu with counter, its list dishes and dishes
+"""
+from typing import Iterable
+from uuid import UUID
+
+from db.cache_repo import CacheMenuAppKeys
+
+
+class InvalidationPlanner(CacheMenuAppKeys):
+    """Class for cache scopes of reads and scopes changed by writes"""
+
+    def catalog_scope(self) -> str:
+        """Scope of list menus and order of menus in nested tree"""
+        return self.get_catalog_key
+
+    def menu_scope(self, menu_id: UUID | str) -> str:
+        """Scope of menu and its slice of nested tree"""
+        return self.generate_key(self.get_menu_key, menu_id)
+
+    def submenus_scope(self, menu_id: UUID | str) -> str:
+        """Scope of list submenus of menu"""
+        return self.generate_key(self.get_list_submenus_key, menu_id)
+
+    def submenu_scope(self, submenu_id: UUID | str) -> str:
+        """Scope of submenu, its list dishes and dishes"""
+        return self.generate_key(self.get_submenu_key, submenu_id)
+
+    def menu_created(self) -> list[str]:
+        """New menu appears in list menus and nested tree"""
+        return [self.catalog_scope()]
+
+    def menu_updated(self, menu_id: UUID | str) -> list[str]:
+        """Menu fields are shown in list menus, menu and its slice"""
+        return [self.catalog_scope(), self.menu_scope(menu_id)]
+
+    def menu_deleted(self, menu_id: UUID | str, submenu_ids: Iterable[UUID | str]) -> list[str]:
+        """Menu is deleted with its submenus and dishes"""
+        return [
+            *self.menu_updated(menu_id),
+            self.submenus_scope(menu_id),
+            *(self.submenu_scope(submenu_id) for submenu_id in submenu_ids),
+        ]
+
+    def submenu_changed(self, menu_id: UUID | str, submenu_id: UUID | str) -> list[str]:
+        """Submenu write changes menu counters, menu slice, list submenus of menu and submenu itself"""
+        return [self.menu_scope(menu_id), self.submenus_scope(menu_id), self.submenu_scope(submenu_id)]
+
+    def dish_changed(self, menu_id: UUID | str, submenu_id: UUID | str) -> list[str]:
+        """Dish write changes menu counters, menu slice, submenu counter and list dishes of submenu"""
+        return [self.menu_scope(menu_id), self.submenu_scope(submenu_id)]
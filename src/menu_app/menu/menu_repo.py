@@ -3,11 +3,22 @@ from typing import Sequence
 from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import Row, RowMapping, delete, distinct, func, insert, select, update
+from sqlalchemy import (
+    Row,
+    RowMapping,
+    Text,
+    cast,
+    delete,
+    func,
+    insert,
+    literal_column,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.engine import Result
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from starlette.responses import JSONResponse
 
 from db.database import get_async_session
 from menu_app.menu.menu_exceptions import MenuExceptions
@@ -30,31 +41,6 @@ class MenuRepository:
         self.models_to_json = models_to_json
         self.menu_exceptions = menu_exceptions
 
-    async def _set_counters_for_menu(
-            self,
-            menu_id: UUID
-    ) -> RowMapping:
-        """
-        Create request for compute submenus count and dishes count for menu
-        Return updated menu schema with dishes_count and submenus_count argument
-        """
-        stmt = (
-            select(
-                Menu,
-                func.count(distinct(Submenu.id)).label('submenus_count'),
-                func.count(distinct(Dish.id)).label('dishes_count')
-            )
-            .join(Submenu, Menu.id == Submenu.menu_id)
-            .join(Dish, Submenu.id == Dish.submenu_id)
-            .where(Menu.id == menu_id)
-            .group_by(Menu.id))
-
-        record: Result = await self.session.execute(stmt)
-        result = record.mappings().first()
-        if not result:
-            return await self.if_menu_exists(menu_id)
-        return result
-
     async def if_menu_exists(self, menu_id: UUID) -> RowMapping:
         """Check if menu exists with get menu_id"""
         record: Result = await self.session.execute(
@@ -75,18 +61,81 @@ class MenuRepository:
             )
         ).scalars().all()
 
-    async def get_all_menus_with_nested_obj(
+    async def get_menu_ids(
             self
-    ) -> Sequence[Row]:
-        """List nested objects with menu"""
+    ) -> Sequence[UUID]:
+        """List menu ids in order of nested tree"""
         return (
             await self.session.execute(
-                select(Menu)
-                .options(selectinload(Menu.submenus)
-                         .selectinload(Submenu.dish))
+                select(Menu.id).order_by(Menu.id)
             )
         ).scalars().all()
 
+    async def get_all_menus_with_nested_obj(
+            self,
+            menu_ids: Sequence[UUID] | None = None
+    ) -> Sequence[Row]:
+        """List nested objects with menu, only menus with menu_ids if set"""
+        query = (
+            select(Menu)
+            .options(selectinload(Menu.submenus)
+                     .selectinload(Submenu.dish))
+        )
+        if menu_ids is not None:
+            query = query.where(Menu.id.in_(menu_ids))
+        return (
+            await self.session.execute(query)
+        ).scalars().all()
+
+    @staticmethod
+    def _nested_menu_json():
+        """Json object of menu with nested submenus and dishes built by database"""
+        empty_json = literal_column("'[]'::json")
+        dishes = (
+            select(func.coalesce(func.json_agg(aggregate_order_by(
+                func.json_build_object(
+                    'id', Dish.id,
+                    'title', Dish.title,
+                    'description', Dish.description,
+                    'price', func.coalesce(Dish.discounted_price, Dish.price),
+                    'discount', Dish.discount,
+                ),
+                Dish.id
+            )), empty_json))
+            .where(Dish.submenu_id == Submenu.id)
+            .scalar_subquery()
+        )
+        submenus = (
+            select(func.coalesce(func.json_agg(aggregate_order_by(
+                func.json_build_object(
+                    'id', Submenu.id,
+                    'title', Submenu.title,
+                    'description', Submenu.description,
+                    'dish', dishes,
+                ),
+                Submenu.id
+            )), empty_json))
+            .where(Submenu.menu_id == Menu.id)
+            .scalar_subquery()
+        )
+        return func.json_build_object(
+            'id', Menu.id,
+            'title', Menu.title,
+            'description', Menu.description,
+            'submenus', submenus,
+        )
+
+    async def get_menus_with_nested_json(
+            self,
+            menu_ids: Sequence[UUID]
+    ) -> dict[str, bytes]:
+        """Nested objects of every menu with menu_ids rendered to json by one database query"""
+        result: Result = await self.session.execute(
+            select(Menu.id, cast(self._nested_menu_json(), Text))
+            .where(Menu.id.in_(menu_ids))
+        )
+        return {str(menu_id): menu.encode() for menu_id, menu in result.all()}
+
     async def create_menu(
             self,
             menu_payload: MenuCreateSchema
@@ -106,19 +155,15 @@ class MenuRepository:
             self,
             menu_id: UUID
     ) -> RowMapping:
-        """Get menu by id"""
-        return await self._set_counters_for_menu(
-            menu_id=menu_id
-        )
+        """Get menu by id with stored submenus_count and dishes_count"""
+        return await self.if_menu_exists(menu_id)
 
     async def update_menu(
             self,
             menu_id: UUID,
             menu_payload: MenuCreateSchema
     ) -> MenuReadSchema:
-        """Update meny bu id"""
-        await self.if_menu_exists(menu_id)
-
+        """Update meny bu id, no updated rows means menu not found"""
         result: Result = await self.session.execute(
             update(Menu)
             .where(
@@ -127,23 +172,35 @@ class MenuRepository:
             .values(menu_payload.model_dump())
             .returning(Menu)
         )
+        menu = result.scalars().first()
+        if menu is None:
+            await self.menu_exceptions.menu_not_found_exception()
         await self.session.commit()
-        return result.scalars().first()
+        return menu
 
     async def delete_menu(
             self,
             menu_id: UUID
-    ) -> JSONResponse:
-        """Delete menu by id"""
-        await self.if_menu_exists(menu_id)
-
-        await self.session.execute(
+    ) -> list[UUID]:
+        """
+        Delete menu by id and return ids of its submenus deleted by cascade
+        Submenus are selected in same statement from snapshot before delete, no rows means menu not found
+        """
+        menu = (
             delete(Menu)
             .where(
                 Menu.id == menu_id
             )
+            .returning(Menu.id)
+            .cte('deleted_menu')
         )
-        await self.session.commit()
-        return JSONResponse(
-            content={'message': 'Success menu delete'}
+        result: Result = await self.session.execute(
+            select(menu.c.id, Submenu.id)
+            .select_from(menu)
+            .outerjoin(Submenu, Submenu.menu_id == menu.c.id)
         )
+        rows = result.all()
+        if not rows:
+            await self.menu_exceptions.menu_not_found_exception()
+        await self.session.commit()
+        return [submenu_id for _, submenu_id in rows if submenu_id is not None]
@@ -1,9 +1,9 @@
 """Menu api routers"""
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Header
 from starlette import status
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
 from menu_app.menu.menu_open_api_builder import MenuOpenApiBuilder
 from menu_app.menu.menu_service import MenuService
@@ -28,10 +28,13 @@ menu_router = APIRouter(
     summary='List Menu'
 )
 async def list_menus(
+        if_none_match: str | None = Header(default=None),
         menu_service: MenuService = Depends()
-) -> list[MenuReadSchema]:
+) -> Response:
     """List menus"""
-    return await menu_service.get_all_menus()
+    return await menu_service.get_all_menus(
+        if_none_match=if_none_match
+    )
 
 
 @menu_router.get(
@@ -42,10 +45,13 @@ async def list_menus(
     summary='list menu with nested objects'
 )
 async def list_menus_with_nested_obj(
+        if_none_match: str | None = Header(default=None),
         menu_service: MenuService = Depends()
-) -> list[MenuReadNested]:
+) -> Response:
     """List menus"""
-    return await menu_service.list_menus_with_nested_obj()
+    return await menu_service.list_menus_with_nested_obj(
+        if_none_match=if_none_match
+    )
 
 
 @menu_router.post(
@@ -77,11 +83,13 @@ async def create_menu(
 )
 async def get_menu(
         menu_id: UUID,
+        if_none_match: str | None = Header(default=None),
         menu_service: MenuService = Depends()
-) -> MenuWithCounterSchema:
+) -> Response:
     """Get menu"""
     return await menu_service.get_menu(
-        menu_id=menu_id
+        menu_id=menu_id,
+        if_none_match=if_none_match
     )
 
 
@@ -1,13 +1,21 @@
 """Menu service layer"""
+from functools import partial
 from uuid import UUID
 
 from fastapi import BackgroundTasks, Depends
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
-from db.cache_repo import CacheMenuAppKeys, CacheRepository
+from config import NESTED_MENUS_MODE
+from db.cache_repo import CacheMenuAppKeys, CacheRepository, get_type_adapter
+from menu_app.invalidation import InvalidationPlanner
 from menu_app.menu.menu_repo import MenuRepository
-from menu_app.schemas import MenuCreateSchema, MenuReadSchema, MenuWithCounterSchema
-from menu_app.utils import MenuConverter, add_discount_to_dish
+from menu_app.schemas import (
+    MenuCreateSchema,
+    MenuReadNested,
+    MenuReadSchema,
+    MenuWithCounterSchema,
+)
+from menu_app.utils import MenuConverter
 
 
 class MenuService:
@@ -17,38 +25,80 @@ class MenuService:
             self,
             menu_repo: MenuRepository = Depends(),
             menu_cache: CacheRepository = Depends(),
-            menu_app_name_keys: CacheMenuAppKeys = Depends()
+            menu_app_name_keys: CacheMenuAppKeys = Depends(),
+            invalidation_planner: InvalidationPlanner = Depends()
     ) -> None:
         self.menu_repo = menu_repo
         self.menu_cache = menu_cache
         self.menu_app_name_keys = menu_app_name_keys
+        self.invalidation_planner = invalidation_planner
 
-    async def get_all_menus(
+    async def _load_all_menus(
             self
     ) -> list[MenuReadSchema]:
-        """Get list menu"""
-        cache_list_menu = await self.menu_cache.get(self.menu_app_name_keys.get_list_menus_key)
-
-        if cache_list_menu is not None:
-            return await MenuConverter.convert_menus_sequence_to_list_menus(cache_list_menu)
+        """Load list menu from db"""
+        return await MenuConverter.convert_menus_sequence_to_list_menus(
+            await self.menu_repo.get_all_menus()
+        )
 
-        list_menus = await self.menu_repo.get_all_menus()
-        await self.menu_cache.set(self.menu_app_name_keys.get_list_menus_key, list_menus)
-        return await MenuConverter.convert_menus_sequence_to_list_menus(list_menus)
+    async def get_all_menus(
+            self,
+            if_none_match: str | None = None
+    ) -> Response:
+        """Get list menu"""
+        return await self.menu_cache.get_or_set_response(
+            self.menu_app_name_keys.get_list_menus_key,
+            self._load_all_menus,
+            list[MenuReadSchema],
+            version_scope=self.invalidation_planner.catalog_scope(),
+            if_none_match=if_none_match,
+        )
 
-    async def list_menus_with_nested_obj(
+    async def _load_menu_ids(
             self
-    ):
-        """list menus with nested obj"""
-        cache_list_menu = await self.menu_cache.get(self.menu_app_name_keys.get_list_menus_nested_key)
-        dishes_discount = await self.menu_cache.get(self.menu_app_name_keys.get_dish_discount_key)
+    ) -> list[str]:
+        """Load menu ids in order of nested tree from db"""
+        return [str(menu_id) for menu_id in await self.menu_repo.get_menu_ids()]
+
+    async def _load_menus_with_nested_obj(
+            self,
+            menu_ids: list[str]
+    ) -> dict[str, bytes]:
+        """Load menus with nested obj from db and render every menu to json"""
+        menus = await MenuConverter.convert_menus_sequence_to_list_nested(
+            await self.menu_repo.get_all_menus_with_nested_obj([UUID(menu_id) for menu_id in menu_ids])
+        )
+        type_adapter = get_type_adapter(MenuReadNested)
+        return {str(menu.id): type_adapter.dump_json(menu, by_alias=True) for menu in menus}
 
-        if cache_list_menu is not None:
-            return await add_discount_to_dish(cache_list_menu, dishes_discount)
+    async def _load_menus_with_nested_json(
+            self,
+            menu_ids: list[str]
+    ) -> dict[str, bytes]:
+        """Load menus with nested obj rendered to json by db"""
+        return await self.menu_repo.get_menus_with_nested_json([UUID(menu_id) for menu_id in menu_ids])
 
-        list_menus_nested = await self.menu_repo.get_all_menus_with_nested_obj()
-        await self.menu_cache.set(self.menu_app_name_keys.get_list_menus_nested_key, list_menus_nested)
-        return await add_discount_to_dish(list_menus_nested, dishes_discount)
+    async def list_menus_with_nested_obj(
+            self,
+            if_none_match: str | None = None
+    ) -> Response:
+        """
+        list menus with nested obj
+        Tree is composed of cached menus, write in menu reloads only this menu
+        In json mode menus are rendered by database
+        """
+        if NESTED_MENUS_MODE == 'json':
+            key, loader = self.menu_app_name_keys.get_list_menus_nested_json_key, self._load_menus_with_nested_json
+        else:
+            key, loader = self.menu_app_name_keys.get_list_menus_nested_key, self._load_menus_with_nested_obj
+        return await self.menu_cache.get_or_set_parts_response(
+            key,
+            self._load_menu_ids,
+            self.invalidation_planner.catalog_scope(),
+            self.invalidation_planner.menu_scope,
+            loader,
+            if_none_match=if_none_match,
+        )
 
     async def create_menu(
             self,
@@ -60,33 +110,37 @@ class MenuService:
             menu_payload=menu_payload
         )
 
-        background_tasks.add_task(self.menu_cache.delete, [
-            self.menu_app_name_keys.get_list_menus_nested_key,
-        ])
-        background_tasks.add_task(
-            self.menu_cache.delete_by_pattern,
-            self.menu_app_name_keys.get_list_menus_key
-        )
+        background_tasks.add_task(self.menu_cache.bump_versions, self.invalidation_planner.menu_created())
         return menu
 
-    async def get_menu(
+    async def _load_menu(
             self,
             menu_id: UUID
     ) -> MenuWithCounterSchema:
+        """Load menu by id from db"""
+        return await MenuConverter.convert_menu_row_to_schema(
+            await self.menu_repo.get_menu(
+                menu_id=menu_id
+            )
+        )
+
+    async def get_menu(
+            self,
+            menu_id: UUID,
+            if_none_match: str | None = None
+    ) -> Response:
         """Get menu by id"""
         menu_key = self.menu_app_name_keys.generate_key(
             self.menu_app_name_keys.get_menu_key,
             menu_id
         )
-        cache_menu = await self.menu_cache.get(menu_key)
-        if cache_menu is not None:
-            return await MenuConverter.convert_menu_row_to_schema(cache_menu)
-
-        menu = await self.menu_repo.get_menu(
-            menu_id=menu_id
+        return await self.menu_cache.get_or_set_response(
+            menu_key,
+            partial(self._load_menu, menu_id),
+            MenuWithCounterSchema,
+            version_scope=self.invalidation_planner.menu_scope(menu_id),
+            if_none_match=if_none_match,
         )
-        await self.menu_cache.set(menu_key, menu)
-        return await MenuConverter.convert_menu_row_to_schema(menu)
 
     async def update_menu(
             self,
@@ -99,20 +153,7 @@ class MenuService:
             menu_id=menu_id,
             menu_payload=menu_payload
         )
-        menu_key = self.menu_app_name_keys.generate_key(
-            self.menu_app_name_keys.get_menu_key,
-            menu_id
-        )
-
-        background_tasks.add_task(self.menu_cache.delete, [
-            self.menu_app_name_keys.get_list_menus_nested_key,
-            menu_key
-        ])
-
-        background_tasks.add_task(
-            self.menu_cache.delete_by_pattern,
-            self.menu_app_name_keys.get_list_menus_key
-        )
+        background_tasks.add_task(self.menu_cache.bump_versions, self.invalidation_planner.menu_updated(menu_id))
         return menu
 
     async def delete_menu(
@@ -121,17 +162,13 @@ class MenuService:
             background_tasks: BackgroundTasks
     ) -> JSONResponse:
         """Delete menu by id"""
-        response = await self.menu_repo.delete_menu(
+        submenu_ids = await self.menu_repo.delete_menu(
             menu_id=menu_id
         )
-        menu_key = self.menu_app_name_keys.generate_key(
-            self.menu_app_name_keys.get_menu_key,
-            menu_id
-        )
         background_tasks.add_task(
-            self.menu_cache.delete_by_pattern,
-            self.menu_app_name_keys.get_list_common_key
+            self.menu_cache.bump_versions,
+            self.invalidation_planner.menu_deleted(menu_id, submenu_ids)
+        )
+        return JSONResponse(
+            content={'message': 'Success menu delete'}
         )
-        background_tasks.add_task(self.menu_cache.delete, [menu_key])
-
-        return response
@@ -1,7 +1,8 @@
 """Models"""
+from decimal import Decimal
 from uuid import UUID, uuid4
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -15,6 +16,8 @@ class Menu(Base):
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     title: Mapped[str]
     description: Mapped[str]
+    submenus_count: Mapped[int] = mapped_column(default=0, server_default='0')
+    dishes_count: Mapped[int] = mapped_column(default=0, server_default='0')
 
     submenus: Mapped[list['Submenu']] = relationship(cascade='all, delete-orphan')
 
@@ -22,22 +25,39 @@ class Menu(Base):
 class Submenu(Base):
     """Model of view table submenu"""
     __tablename__ = 'submenu'
+    __table_args__ = (
+        UniqueConstraint('title', name='uq_submenu_title', deferrable=True, initially='DEFERRED'),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     title: Mapped[str]
     description: Mapped[str]
+    dishes_count: Mapped[int] = mapped_column(default=0, server_default='0')
 
-    menu_id: Mapped[UUID] = mapped_column(ForeignKey('menu.id', ondelete='CASCADE'))
+    menu_id: Mapped[UUID] = mapped_column(ForeignKey('menu.id', ondelete='CASCADE'), index=True)
     dish: Mapped[list['Dish']] = relationship(cascade='all, delete-orphan')
 
 
+def default_discounted_price(context) -> str:
+    """
+    Discounted price of new dish is price until sync set discount
+    Column is nullable, so it is added to existing table, reads use price until sync fills it
+    """
+    return f"{Decimal(context.get_current_parameters().get('price')):.2f}"
+
+
 class Dish(Base):
     """Model of view table dish"""
     __tablename__ = 'dish'
+    __table_args__ = (
+        UniqueConstraint('title', name='uq_dish_title', deferrable=True, initially='DEFERRED'),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     title: Mapped[str]
     description: Mapped[str]
     price: Mapped[str]
+    discount: Mapped[str] = mapped_column(default='0%', server_default='0%')
+    discounted_price: Mapped[str | None] = mapped_column(default=default_discounted_price)
 
-    submenu_id: Mapped[UUID] = mapped_column(ForeignKey('submenu.id', ondelete='CASCADE'))
+    submenu_id: Mapped[UUID] = mapped_column(ForeignKey('submenu.id', ondelete='CASCADE'), index=True)
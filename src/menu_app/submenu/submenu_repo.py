@@ -1,16 +1,18 @@
 """Submenu Repository Pattern"""
 from typing import Sequence
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from fastapi import Depends
-from sqlalchemy import Row, RowMapping, delete, func, insert, select, update
+from sqlalchemy import Row, RowMapping, delete, insert, literal, select, update
 from sqlalchemy.engine import Result
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.responses import JSONResponse
 
 from db.database import get_async_session
+from db.errors import is_unique_violation
 from menu_app.menu.menu_repo import MenuRepository
-from menu_app.models import Dish, Submenu
+from menu_app.models import Menu, Submenu
 from menu_app.schemas import SubMenuCreateSchema, SubMenuReadSchema
 from menu_app.submenu.submenu_exceptions import SubmenuExceptions
 
@@ -28,30 +30,6 @@ class SubmenuRepository:
         self.menu_repo = menu_repo
         self.submenu_exceptions = submenu_exceptions
 
-    async def _set_counters_for_submenu(
-            self,
-            submenu_id: UUID
-    ) -> RowMapping:
-        """
-        Create request for compute dishes count for submenu
-        Return updated submenu schema with dishes_count argument
-        """
-        stmt = (
-            select(
-                Submenu,
-                (func.count(Dish.id)).label('dishes_count')
-            )
-            .select_from(Submenu)
-            .join(Dish)
-            .where(Submenu.id == submenu_id)
-            .group_by(Submenu.id)
-        )
-        record: Result = await self.session.execute(stmt)
-        result = record.mappings().first()
-        if not result:
-            return await self.if_submenu_exists(submenu_id=submenu_id)
-        return result
-
     async def if_submenu_exists(
             self,
             submenu_id: UUID
@@ -65,18 +43,18 @@ class SubmenuRepository:
             await self.submenu_exceptions.submenu_not_found_exception()
         return result
 
-    async def check_submenu_unique(
-            self,
-            title: str
-    ) -> Row:
-        """Check submenu title unique"""
-        record: Result = await self.session.execute(
-            select(Submenu).where(Submenu.title == title)
-        )
-        result = record.scalars().first()
-        if result:
+    async def commit_unique_title(self) -> None:
+        """
+        Commit session, unique title is checked by deferred constraint on commit
+        Violation is rolled back and raised as submenu title exists exception
+        """
+        try:
+            await self.session.commit()
+        except IntegrityError as error:
+            await self.session.rollback()
+            if not is_unique_violation(error):
+                raise
             await self.submenu_exceptions.submenu_title_exists_exception()
-        return result
 
     async def get_all_submenus(
             self,
@@ -99,63 +77,89 @@ class SubmenuRepository:
             submenu_payload: SubMenuCreateSchema
     ) -> SubMenuReadSchema:
         """
-        Create new submenu
-        Only if menu exists and new title submenu unique
+        Create new submenu by one statement
+        Menu counter is updated in CTE, submenu is inserted only if menu row was updated
+        Title is checked by unique constraint
         """
-        await self.menu_repo.if_menu_exists(menu_id=menu_id)
-
-        submenu_payload_dict = submenu_payload.model_dump()
-        await self.check_submenu_unique(title=submenu_payload_dict.get('title'))
-        submenu_payload_dict.update({'menu_id': menu_id})
+        menu = (
+            update(Menu)
+            .where(Menu.id == menu_id)
+            .values(submenus_count=Menu.submenus_count + 1)
+            .returning(Menu.id)
+            .cte('counted_menu')
+        )
+        submenu_values = {'id': uuid4(), **submenu_payload.model_dump()}
         result: Result = await self.session.execute(
             insert(Submenu)
-            .values(
-                submenu_payload_dict
+            .from_select(
+                [*submenu_values, 'menu_id'],
+                select(*(literal(value) for value in submenu_values.values()), menu.c.id)
             )
             .returning(Submenu)
         )
-        await self.session.commit()
-        return result.scalars().first()
+        submenu = result.scalars().first()
+        if submenu is None:
+            await self.menu_repo.menu_exceptions.menu_not_found_exception()
+        await self.commit_unique_title()
+        return submenu
 
     async def get_submenu(
             self,
             submenu_id: UUID
     ) -> RowMapping:
-        """Get submenu by id"""
-        return await self._set_counters_for_submenu(submenu_id)
+        """Get submenu by id with stored dishes_count"""
+        return await self.if_submenu_exists(submenu_id)
 
     async def update_submenu(
             self,
+            menu_id: UUID,
             submenu_id: UUID,
             submenu_payload: SubMenuCreateSchema
     ) -> SubMenuReadSchema:
-        """Update submenu bu id"""
-        await self.if_submenu_exists(submenu_id)
-        submenu_payload_dict = submenu_payload.model_dump()
-        await self.check_submenu_unique(title=submenu_payload_dict.get('title'))
+        """Update submenu bu id in menu, no updated rows means submenu not found"""
         result: Result = await self.session.execute(
             update(Submenu)
             .where(
-                Submenu.id == submenu_id
+                Submenu.id == submenu_id,
+                Submenu.menu_id == menu_id
             )
-            .values(submenu_payload_dict)
+            .values(submenu_payload.model_dump())
             .returning(Submenu)
         )
-        await self.session.commit()
-        return result.scalars().first()
+        submenu = result.scalars().first()
+        if submenu is None:
+            await self.submenu_exceptions.submenu_not_found_exception()
+        await self.commit_unique_title()
+        return submenu
 
     async def delete_submenu(
             self,
+            menu_id: UUID,
             submenu_id: UUID
     ) -> JSONResponse:
-        """Delete submenu by id"""
-        await self.if_submenu_exists(submenu_id)
-
-        await self.session.execute(
+        """
+        Delete submenu by id in menu and update menu counters by one statement
+        No updated menu means submenu not found
+        """
+        submenu = (
             delete(Submenu)
             .where(
-                Submenu.id == submenu_id
+                Submenu.id == submenu_id,
+                Submenu.menu_id == menu_id
+            )
+            .returning(Submenu.menu_id, Submenu.dishes_count)
+            .cte('deleted_submenu')
+        )
+        result: Result = await self.session.execute(
+            update(Menu)
+            .where(Menu.id == submenu.c.menu_id)
+            .values(
+                submenus_count=Menu.submenus_count - 1,
+                dishes_count=Menu.dishes_count - submenu.c.dishes_count
             )
+            .returning(Menu.id)
         )
+        if result.scalar_one_or_none() is None:
+            await self.submenu_exceptions.submenu_not_found_exception()
         await self.session.commit()
         return JSONResponse(content={'message': 'Success submenu delete'})
@@ -1,9 +1,9 @@
 """Submenu api routers"""
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Header
 from starlette import status
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
 from menu_app.menu.menu_open_api_builder import MenuOpenApiBuilder
 from menu_app.schemas import (
@@ -31,11 +31,13 @@ submenu_router = APIRouter(
 )
 async def list_submenus(
         menu_id: UUID,
+        if_none_match: str | None = Header(default=None),
         submenu_service: SubmenuService = Depends()
-) -> list[SubMenuReadSchema]:
+) -> Response:
     """List submenus"""
     return await submenu_service.get_all_submenus(
-        menu_id=menu_id
+        menu_id=menu_id,
+        if_none_match=if_none_match
     )
 
 
@@ -74,11 +76,13 @@ async def create_submenu(
 )
 async def get_submenu(
         submenu_id: UUID,
+        if_none_match: str | None = Header(default=None),
         submenu_service: SubmenuService = Depends()
-) -> SubMenuWithCounterSchema:
+) -> Response:
     """Get submenu"""
     return await submenu_service.get_submenu(
-        submenu_id=submenu_id
+        submenu_id=submenu_id,
+        if_none_match=if_none_match
     )
 
 
@@ -94,6 +98,7 @@ async def get_submenu(
     )
 )
 async def update_submenu(
+        menu_id: UUID,
         submenu_id: UUID,
         payload: SubMenuCreateSchema,
         background_tasks: BackgroundTasks,
@@ -101,6 +106,7 @@ async def update_submenu(
 ) -> SubMenuReadSchema:
     """Update submenu"""
     return await submenu_service.update_submenu(
+        menu_id=menu_id,
         submenu_id=submenu_id,
         submenu_payload=payload,
         background_tasks=background_tasks,
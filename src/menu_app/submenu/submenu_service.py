@@ -1,10 +1,12 @@
 """Submenu service layer"""
+from functools import partial
 from uuid import UUID
 
 from fastapi import BackgroundTasks, Depends
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
 from db.cache_repo import CacheMenuAppKeys, CacheRepository
+from menu_app.invalidation import InvalidationPlanner
 from menu_app.schemas import (
     SubMenuCreateSchema,
     SubMenuReadSchema,
@@ -21,31 +23,42 @@ class SubmenuService:
             self,
             submenu_repo: SubmenuRepository = Depends(),
             submenu_cache: CacheRepository = Depends(),
-            menu_app_name_keys: CacheMenuAppKeys = Depends()
+            menu_app_name_keys: CacheMenuAppKeys = Depends(),
+            invalidation_planner: InvalidationPlanner = Depends()
     ) -> None:
         self.submenu_repo = submenu_repo
         self.submenu_cache = submenu_cache
         self.menu_app_name_keys = menu_app_name_keys
+        self.invalidation_planner = invalidation_planner
 
-    async def get_all_submenus(
+    async def _load_all_submenus(
             self,
             menu_id: UUID
     ) -> list[SubMenuReadSchema]:
+        """Load list submenu from db"""
+        return await SubmenuConverter.convert_submenus_sequence_to_list_submenus(
+            await self.submenu_repo.get_all_submenus(
+                menu_id=menu_id
+            )
+        )
+
+    async def get_all_submenus(
+            self,
+            menu_id: UUID,
+            if_none_match: str | None = None
+    ) -> Response:
         """Get list submenu"""
         list_submenus_key = self.menu_app_name_keys.generate_key(
             self.menu_app_name_keys.get_list_submenus_key,
             menu_id
         )
-        cache_list_submenu = await self.submenu_cache.get(list_submenus_key)
-
-        if cache_list_submenu is not None:
-            return await SubmenuConverter.convert_submenus_sequence_to_list_submenus(cache_list_submenu)
-
-        list_submenus = await self.submenu_repo.get_all_submenus(
-            menu_id=menu_id
+        return await self.submenu_cache.get_or_set_response(
+            list_submenus_key,
+            partial(self._load_all_submenus, menu_id),
+            list[SubMenuReadSchema],
+            version_scope=self.invalidation_planner.submenus_scope(menu_id),
+            if_none_match=if_none_match,
         )
-        await self.submenu_cache.set(list_submenus_key, list_submenus)
-        return await SubmenuConverter.convert_submenus_sequence_to_list_submenus(list_submenus)
 
     async def create_submenu(
             self,
@@ -59,57 +72,57 @@ class SubmenuService:
             menu_id=menu_id
         )
         background_tasks.add_task(
-            self.submenu_cache.delete_by_pattern,
-            self.menu_app_name_keys.get_list_submenus_key
+            self.submenu_cache.bump_versions,
+            self.invalidation_planner.submenu_changed(menu_id, submenu.id)
         )
-        background_tasks.add_task(self.submenu_cache.delete, [
-            self.menu_app_name_keys.get_list_menus_nested_key,
-        ])
         return submenu
 
-    async def get_submenu(
+    async def _load_submenu(
             self,
             submenu_id: UUID
     ) -> SubMenuWithCounterSchema:
+        """Load submenu by id from db"""
+        return await SubmenuConverter.convert_submenu_row_to_schema(
+            await self.submenu_repo.get_submenu(
+                submenu_id=submenu_id
+            )
+        )
+
+    async def get_submenu(
+            self,
+            submenu_id: UUID,
+            if_none_match: str | None = None
+    ) -> Response:
         """Get submenu by id"""
         submenu_key = self.menu_app_name_keys.generate_key(
             self.menu_app_name_keys.get_submenu_key,
             submenu_id
         )
-        cache_submenu = await self.submenu_cache.get(submenu_key)
-        if cache_submenu is not None:
-            return await SubmenuConverter.convert_submenu_row_to_schema(cache_submenu)
-
-        submenu = await self.submenu_repo.get_submenu(
-            submenu_id=submenu_id
+        return await self.submenu_cache.get_or_set_response(
+            submenu_key,
+            partial(self._load_submenu, submenu_id),
+            SubMenuWithCounterSchema,
+            version_scope=self.invalidation_planner.submenu_scope(submenu_id),
+            if_none_match=if_none_match,
         )
-        await self.submenu_cache.set(submenu_key, submenu)
-        return await SubmenuConverter.convert_submenu_row_to_schema(submenu)
 
     async def update_submenu(
             self,
+            menu_id: UUID,
             submenu_id: UUID,
             submenu_payload: SubMenuCreateSchema,
             background_tasks: BackgroundTasks
     ) -> SubMenuReadSchema:
         """Update submenu by id"""
         submenu = await self.submenu_repo.update_submenu(
+            menu_id=menu_id,
             submenu_id=submenu_id,
             submenu_payload=submenu_payload
         )
-        submenu_key = self.menu_app_name_keys.generate_key(
-            self.menu_app_name_keys.get_submenu_key,
-            submenu_id
-        )
-
         background_tasks.add_task(
-            self.submenu_cache.delete_by_pattern,
-            self.menu_app_name_keys.get_list_submenus_key
+            self.submenu_cache.bump_versions,
+            self.invalidation_planner.submenu_changed(menu_id, submenu_id)
         )
-        background_tasks.add_task(self.submenu_cache.delete, [
-            self.menu_app_name_keys.get_list_menus_nested_key,
-            submenu_key
-        ])
         return submenu
 
     async def delete_submenu(
@@ -120,27 +133,11 @@ class SubmenuService:
     ) -> JSONResponse:
         """Delete submenu by id"""
         response = await self.submenu_repo.delete_submenu(
+            menu_id=menu_id,
             submenu_id=submenu_id
         )
-        submenu_key = self.menu_app_name_keys.generate_key(
-            self.menu_app_name_keys.get_submenu_key,
-            submenu_id
-        )
-        menu_key = self.menu_app_name_keys.generate_key(
-            self.menu_app_name_keys.get_menu_key,
-            menu_id
-        )
-        background_tasks.add_task(
-            self.submenu_cache.delete_by_pattern,
-            self.menu_app_name_keys.get_list_dishes_key
-        )
         background_tasks.add_task(
-            self.submenu_cache.delete_by_pattern,
-            self.menu_app_name_keys.get_list_submenus_key
+            self.submenu_cache.bump_versions,
+            self.invalidation_planner.submenu_changed(menu_id, submenu_id)
         )
-        background_tasks.add_task(self.submenu_cache.delete, [
-            self.menu_app_name_keys.get_list_menus_nested_key,
-            menu_key,
-            submenu_key
-        ])
         return response
@@ -7,8 +7,10 @@ from sqlalchemy import Row, RowMapping
 
 from menu_app.schemas import (
     DishReadWithDiscountSchema,
+    MenuReadNested,
     MenuReadSchema,
     MenuWithCounterSchema,
+    SubmenuReadNested,
     SubMenuReadSchema,
     SubMenuWithCounterSchema,
 )
@@ -47,18 +49,39 @@ class MenuConverter:
             for menu in menus
         ]
 
+    @staticmethod
+    async def convert_menus_sequence_to_list_nested(menus: Sequence[Row]) -> list[MenuReadNested]:
+        """Convert Sequence[Row] with loaded submenus and dishes to list[MenuReadNested]"""
+        return [
+            MenuReadNested(
+                id=menu.id,
+                title=menu.title,
+                description=menu.description,
+                submenus=[
+                    SubmenuReadNested(
+                        id=submenu.id,
+                        title=submenu.title,
+                        description=submenu.description,
+                        dish=await DishConverter.convert_dish_sequence_to_list_dish(submenu.dish)
+                    )
+                    for submenu in menu.submenus
+                ]
+            )
+            for menu in menus
+        ]
+
     @staticmethod
     async def convert_menu_row_to_schema(
             menu_row_mapping: RowMapping,
     ) -> MenuWithCounterSchema:
-        """Convert Sequence[Row] to MenuWithCounterSchema"""
+        """Convert Row to MenuWithCounterSchema"""
         menu = menu_row_mapping.get('Menu')
         return MenuWithCounterSchema(
             id=menu.id,
             title=menu.title,
             description=menu.description,
-            dishes_count=menu_row_mapping.get('dishes_count', 0),
-            submenus_count=menu_row_mapping.get('submenus_count', 0)
+            dishes_count=menu.dishes_count,
+            submenus_count=menu.submenus_count
         )
 
 
@@ -80,96 +103,93 @@ class SubmenuConverter:
     async def convert_submenu_row_to_schema(
             submenu_row_mapping: RowMapping,
     ) -> SubMenuWithCounterSchema:
-        """Convert Sequence[Row] to SubMenuWithCounterSchema"""
+        """Convert Row to SubMenuWithCounterSchema"""
         submenu = submenu_row_mapping.get('Submenu')
         return SubMenuWithCounterSchema(
             id=submenu.id,
             title=submenu.title,
             description=submenu.description,
-            dishes_count=submenu_row_mapping.get('dishes_count', 0),
+            dishes_count=submenu.dishes_count,
         )
 
 
 class DishConverter:
     """Class for convert Dish model"""
 
+    @staticmethod
+    async def build_discount_index(
+            dishes_discount: list[dict]
+    ) -> dict[str, str]:
+        """
+        Build discount index dish title -> discount from list dict of dishes discount
+        First discount for title wins, empty or invalid discount is 0
+        """
+        discount_index: dict[str, str] = {}
+        for obj in dishes_discount:
+            title, discount = obj.get('title'), obj.get('discount')
+            if title in discount_index:
+                continue
+            try:
+                valid = bool(discount) and float(discount) <= 99
+            except ValueError:
+                valid = False
+            discount_index[title] = str(Decimal(discount)) if valid else '0'
+        return discount_index
+
     @staticmethod
     async def return_dish_discount(
             dish_title: str,
-            dishes_discount: Sequence[Row] | RowMapping | list[dict] | None
+            discount_index: dict[str, str] | None
     ) -> Decimal:
-        """Filter list dict of dishes discount by dish title"""
-        try:
-            if not dishes_discount:
-                return Decimal(0)
-            dish = list(filter(lambda obj: dish_title in obj.get('title'), dishes_discount))
-            if not dish[0].get('discount') or float(dish[0].get('discount')) > 99:
-                return Decimal(0)
-            return Decimal(dish[0].get('discount'))
-        except IndexError:
+        """Get dish discount from discount index by dish title"""
+        if not discount_index:
             return Decimal(0)
+        return Decimal(discount_index.get(dish_title, 0))
+
+    @staticmethod
+    async def return_dish_pricing(
+            dish_title: str,
+            price: str,
+            discount_index: dict[str, str] | None
+    ) -> dict[str, str]:
+        """Compute discount and discounted price stored with dish"""
+        discount = await DishConverter.return_dish_discount(dish_title, discount_index)
+        return {
+            'discount': f'{discount}%',
+            'discounted_price': f'{Decimal(price) * (1 - (discount / 100)):.2f}',
+        }
 
     @staticmethod
     async def convert_dish_sequence_to_list_dish(
             dishes: Sequence[Row],
-            dishes_discount: Sequence[Row] | list[dict] | None
     ) -> list[DishReadWithDiscountSchema]:
-        """Convert Sequence[Row] to list[DishReadSchema]"""
-        dish_schemas = []
-        for dish in dishes:
-            discount = await DishConverter.return_dish_discount(dish.title, dishes_discount)
-            dish_schemas.append(DishReadWithDiscountSchema(
+        """Convert Sequence[Row] to list[DishReadWithDiscountSchema] with stored discounted price"""
+        return [
+            DishReadWithDiscountSchema(
                 id=dish.id,
                 title=dish.title,
                 description=dish.description,
-                price=f'{Decimal(dish.price) * (1 - (discount / 100)):.2f}',
-                discount=f'{discount}%'
-            ))
-        return dish_schemas
+                price=dish.discounted_price or dish.price,
+                discount=dish.discount
+            )
+            for dish in dishes
+        ]
 
     @staticmethod
     async def convert_dish_row_to_schema(
             dish_row_mapping: RowMapping,
-            dishes_discount: RowMapping | list[dict] | None
     ) -> DishReadWithDiscountSchema:
-        """Convert Row to DishReadSchema"""
-        dish = dish_row_mapping.get('Dish')
-        discount = await DishConverter.return_dish_discount(dish.title, dishes_discount)
+        """Convert Row to DishReadWithDiscountSchema with stored discounted price"""
+        dish = dish_row_mapping['Dish']
         return DishReadWithDiscountSchema(
             id=dish.id,
             title=dish.title,
             description=dish.description,
-            price=f'{Decimal(dish.price) * (1 - (discount / 100)):.2f}',
-            discount=f'{discount}%'
+            price=dish.discounted_price or dish.price,
+            discount=dish.discount
         )
 
 
-async def add_discount_to_dish(
-        list_menus_nested: Sequence[Row],
-        dishes_discount: list[dict]
-) -> list[dict]:
-    """Add to every dish discount and calculate new price"""
-    list_menus_object: list = []
-    for (index, menu) in enumerate(list_menus_nested):
-        list_menus_object.append(
-            {
-                'id': menu.id, 'title': menu.title, 'description': menu.description, 'submenus': []
-            })
-        for (index_s, submenu) in enumerate(menu.submenus):
-            list_menus_object[index].get('submenus').append(
-                {'id': submenu.id, 'title': submenu.title, 'description': submenu.description, 'dish': []}
-            )
-            for dish in submenu.dish:
-                discount = await DishConverter.return_dish_discount(dish.title, dishes_discount)
-                list_menus_object[index].get('submenus')[index_s].get('dish').append(
-                    {
-                        'id': dish.id, 'title': dish.title, 'description': dish.description,
-                        'price': f'{Decimal(dish.price) * (1 - (discount / 100)):.2f}',
-                        'discount': f'{discount}%'
-                    })
-    return list_menus_object
-
-
 def concat_dicts(*dicts: dict) -> dict:
     """Concat getting dict to one dict"""
     return reduce(lambda dict_1, dict_2: {**dict_1, **dict_2}, dicts)
@@ -1,22 +1,16 @@
 """Setting pytest"""
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import (
-    AsyncEngine,
-    AsyncSession,
-    async_sessionmaker,
-    create_async_engine,
-)
-from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 from config import DB_HOST_TEST, DB_NAME_TEST, DB_PASS_TEST, DB_PORT_TEST, DB_USER_TEST
-from db.database import get_async_session
+from db.database import build_engine, get_async_session
 from main import app
 
 DATABASE_URL_TEST = f'postgresql+asyncpg://{DB_USER_TEST}:{DB_PASS_TEST}@{DB_HOST_TEST}:{DB_PORT_TEST}/{DB_NAME_TEST}'
 
 pytest_plugins = 'tests.fixtures'
-engine_test: AsyncEngine = create_async_engine(DATABASE_URL_TEST, poolclass=NullPool)
+engine_test: AsyncEngine = build_engine(DATABASE_URL_TEST, use_null_pool=True)
 async_session_maker = async_sessionmaker(
     bind=engine_test,
     class_=AsyncSession,
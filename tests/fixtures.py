@@ -6,9 +6,10 @@ from typing import AsyncGenerator
 import pytest
 from conftest import async_session_maker, engine_test
 from httpx import AsyncClient
-from sqlalchemy import insert, select
+from sqlalchemy import delete, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from db import database
 from main import app
 from menu_app.models import Base, Dish, Menu, Submenu
 from menu_app.schemas import DishReadSchema, MenuReadSchema, SubMenuReadSchema
@@ -125,3 +126,18 @@ async def get_dish_id(
 ) -> str:
     """Select Dish first instance"""
     return str(get_dish_instance.id)
+
+
+@pytest.fixture
+async def sync_database(
+        get_async_session: AsyncSession,
+        monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Clear menu tables for sync from excel document
+    Bind session maker of sync to test database
+    """
+    for model in (Dish, Submenu, Menu):
+        await get_async_session.execute(delete(model))
+    await get_async_session.commit()
+    monkeypatch.setattr(database, 'async_session_maker', async_session_maker)
@@ -0,0 +1,47 @@
+"""
+Admin tests
+"""
+from httpx import AsyncClient
+from utils import reverse
+
+from admin_app.admin_router import get_pool_stats, get_sync_runs, get_sync_stats
+from menu_app.menu.menu_router import list_menus
+
+
+class TestPoolStats:
+    async def test_pool_stats_success(
+            self,
+            ac: AsyncClient
+    ) -> None:
+        """Check redis pool stats after request use cache"""
+        await ac.get(await reverse(list_menus))
+        response = await ac.get(await reverse(get_pool_stats))
+        assert response.status_code == 200
+        data = response.json().get('redis')
+        assert data.get('max_connections') > 0
+        assert data.get('in_use_connections') + data.get('available_connections') <= data.get('max_connections')
+
+
+class TestSyncStats:
+    async def test_sync_stats_success(
+            self,
+            ac: AsyncClient
+    ) -> None:
+        """Check sync runs counters"""
+        response = await ac.get(await reverse(get_sync_stats))
+        assert response.status_code == 200
+        data = response.json()
+        assert data.get('skipped') >= 0
+        assert data.get('applied') >= 0
+        assert data.get('last_invalidated_keys') >= 0
+
+
+class TestSyncRuns:
+    async def test_sync_runs_success(
+            self,
+            ac: AsyncClient
+    ) -> None:
+        """Check history of sync runs"""
+        response = await ac.get(await reverse(get_sync_runs), params={'limit': 5})
+        assert response.status_code == 200
+        assert len(response.json()) <= 5
@@ -0,0 +1,65 @@
+"""
+Cache codec tests
+"""
+from uuid import uuid4
+
+import orjson
+
+from db.cache_codec import CACHE_FORMAT_VERSION, CacheCodec
+from db.cache_repo import etag_matches, render_response
+from menu_app.schemas import DishReadSchema, DishReadWithDiscountSchema
+
+
+class TestCacheCodec:
+    async def test_schema_round_trip_success(self) -> None:
+        """Encode list of schemas and rebuild them from records"""
+        codec = CacheCodec()
+        dish = DishReadSchema(id=uuid4(), title='string', description='string', price='12.389')
+        records = codec.decode(codec.encode([dish]))
+        assert [DishReadSchema.model_validate(record) for record in records] == [dish]
+        assert records[0].get('price') == '12.389'
+
+    async def test_compress_above_threshold_success(self) -> None:
+        """Compress payload only above threshold"""
+        codec = CacheCodec(compression='zlib', compress_threshold=100)
+        small = [{'title': 'string'}]
+        large = [{'title': 'string'}] * 100
+        assert codec.encode(small)[1] == 0
+        assert codec.encode(large)[1] != 0
+        assert codec.decode(codec.encode(large)) == large
+
+    async def test_other_version_ignored(self) -> None:
+        """Payload of other format version is cache miss"""
+        codec = CacheCodec()
+        payload = codec.encode({'title': 'string'})
+        assert codec.decode(bytes((CACHE_FORMAT_VERSION + 1,)) + payload[1:]) is None
+
+    async def test_raw_bytes_round_trip_success(self) -> None:
+        """Raw bytes are stored as is and compressed above threshold"""
+        codec = CacheCodec(compression='zlib', compress_threshold=100)
+        content = b'[{"title": "string"}]' * 100
+        assert codec.decode_bytes(codec.encode_bytes(content)) == content
+
+    async def test_render_response_success(self) -> None:
+        """Response bytes are rendered by response model with field serializers"""
+        dish = DishReadWithDiscountSchema(id=uuid4(), title='string', description='string', price='12.389')
+
+        async def loader():
+            return [dish]
+
+        content = await render_response(loader, list[DishReadWithDiscountSchema])
+        assert orjson.loads(content) == [{
+            'id': str(dish.id),
+            'title': 'string',
+            'description': 'string',
+            'price': '12.39',
+            'discount': '0%',
+        }]
+
+    async def test_etag_matches_success(self) -> None:
+        """If-None-Match matches weak, listed and any etags"""
+        assert etag_matches('"catalog-1"', '"catalog-1"')
+        assert etag_matches('"catalog-1"', 'W/"catalog-0", W/"catalog-1"')
+        assert etag_matches('"catalog-1"', '*')
+        assert not etag_matches('"catalog-1"', '"catalog-0"')
+        assert not etag_matches('"catalog-1"', None)
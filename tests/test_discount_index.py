@@ -0,0 +1,36 @@
+"""
+Discount index tests
+"""
+from decimal import Decimal
+
+from menu_app.utils import DishConverter
+
+
+class TestDiscountIndex:
+    async def test_build_discount_index_success(self) -> None:
+        """First discount for title wins, invalid discount is 0"""
+        discount_index = await DishConverter.build_discount_index([
+            {'title': 'dish 1', 'discount': '10'},
+            {'title': 'dish 1', 'discount': '20'},
+            {'title': 'dish 2', 'discount': ''},
+            {'title': 'dish 3', 'discount': '100'},
+            {'title': 'dish 4', 'discount': 'abc'},
+        ])
+        assert discount_index == {'dish 1': '10', 'dish 2': '0', 'dish 3': '0', 'dish 4': '0'}
+
+    async def test_return_dish_discount_success(self) -> None:
+        """Discount is found by exact dish title"""
+        discount_index = {'dish 1': '12.5'}
+        assert await DishConverter.return_dish_discount('dish 1', discount_index) == Decimal('12.5')
+        assert await DishConverter.return_dish_discount('dish', discount_index) == Decimal(0)
+        assert await DishConverter.return_dish_discount('dish 1', None) == Decimal(0)
+
+    async def test_return_dish_pricing_success(self) -> None:
+        """Pricing stored with dish is computed once from discount index"""
+        discount_index = {'dish 1': '10'}
+        assert await DishConverter.return_dish_pricing('dish 1', '12.50', discount_index) == {
+            'discount': '10%', 'discounted_price': '11.25'
+        }
+        assert await DishConverter.return_dish_pricing('dish 2', '12.5', discount_index) == {
+            'discount': '0%', 'discounted_price': '12.50'
+        }
@@ -103,6 +103,61 @@ class TestListDish:
             assert DishReadSchema(**obj)
 
 
+class TestDishETag:
+    async def test_list_dishes_not_modified_success(
+            self,
+            ac: AsyncClient,
+            get_menu_id: str,
+            get_submenu_id: str
+    ) -> None:
+        """List dishes has ETag, request with matched If-None-Match gets 304 without body"""
+        url = await reverse(
+            list_dishes,
+            menu_id=get_menu_id,
+            submenu_id=get_submenu_id
+        )
+        response = await ac.get(url)
+        assert response.status_code == 200
+        etag = response.headers.get('ETag')
+        assert etag
+        response = await ac.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.headers.get('ETag') == etag
+        assert response.content == b''
+
+    async def test_list_dishes_etag_changed_success(
+            self,
+            ac: AsyncClient,
+            get_menu_id: str,
+            get_submenu_id: str,
+            get_dish_id: str
+    ) -> None:
+        """Update dish changes ETag of list dishes, old ETag gets full response"""
+        url = await reverse(
+            list_dishes,
+            menu_id=get_menu_id,
+            submenu_id=get_submenu_id
+        )
+        etag = (await ac.get(url)).headers.get('ETag')
+        response = await ac.patch(
+            await reverse(
+                update_dish,
+                menu_id=get_menu_id,
+                submenu_id=get_submenu_id,
+                dish_id=get_dish_id
+            ),
+            json={
+                'title': 'etag_string',
+                'description': 'etag_desc',
+                'price': '12.389'
+            })
+        assert response.status_code == 200
+        response = await ac.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers.get('ETag') != etag
+        assert response.json()[0].get('title') == 'etag_string'
+
+
 class TestGetDish:
 
     async def test_get_dish_success(
@@ -195,6 +250,28 @@ class TestUpdateDish:
         assert response.status_code == 404
         assert response.json().get('detail') == 'dish not found'
 
+    async def test_patch_dish_other_submenu_failed(
+            self,
+            ac: AsyncClient,
+            get_menu_id: str,
+            get_dish_instance: DishReadSchema
+    ) -> None:
+        """Check 404 for update dish by path with other submenu"""
+        response = await ac.patch(
+            await reverse(
+                update_dish,
+                menu_id=get_menu_id,
+                submenu_id=uuid4(),
+                dish_id=get_dish_instance.id
+            ),
+            json={
+                'title': 'new_string',
+                'description': 'new_desc',
+                'price': '12.91111'
+            })
+        assert response.status_code == 404
+        assert response.json().get('detail') == 'dish not found'
+
     async def test_patch_submenu_entity_failed(
             self,
             ac: AsyncClient,
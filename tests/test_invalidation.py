@@ -0,0 +1,24 @@
+"""
+Invalidation planner tests
+"""
+from menu_app.invalidation import InvalidationPlanner
+
+
+class TestInvalidationPlanner:
+    async def test_dish_changed_success(self) -> None:
+        """Dish write keeps list menus and other menus warm"""
+        assert InvalidationPlanner().dish_changed('m', 's') == ['menu_m', 'submenu_s']
+
+    async def test_submenu_changed_success(self) -> None:
+        """Submenu write changes only its menu, list submenus of menu and submenu"""
+        assert InvalidationPlanner().submenu_changed('m', 's') == ['menu_m', 'list_submenus_m', 'submenu_s']
+
+    async def test_menu_deleted_success(self) -> None:
+        """Menu delete changes catalog and every scope of deleted subtree"""
+        assert InvalidationPlanner().menu_deleted('m', ['s1', 's2']) == [
+            'catalog',
+            'menu_m',
+            'list_submenus_m',
+            'submenu_s1',
+            'submenu_s2',
+        ]
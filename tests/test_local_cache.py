@@ -0,0 +1,40 @@
+"""
+Local cache tests
+"""
+from db.local_cache import LocalCache
+
+
+class TestLocalCache:
+    async def test_disabled_cache_miss(self) -> None:
+        """Cache without invalidation subscription always miss"""
+        cache = LocalCache()
+        cache.set('key', b'value', cache.generation)
+        assert cache.get('key') is None
+
+    async def test_lru_bounded_by_size(self) -> None:
+        """Least recently used entries evicted above max bytes"""
+        cache = LocalCache(max_bytes=10)
+        cache.enable()
+        cache.set('first', b'12345', cache.generation)
+        cache.set('second', b'12345', cache.generation)
+        assert cache.get('first') == b'12345'
+        cache.set('third', b'12345', cache.generation)
+        assert cache.get('second') is None
+        assert cache.get('first') == b'12345'
+        assert cache.get('third') == b'12345'
+
+    async def test_expired_entry_miss(self) -> None:
+        """Entry older than ttl is miss"""
+        cache = LocalCache(ttl=-1)
+        cache.enable()
+        cache.set('key', b'value', cache.generation)
+        assert cache.get('key') is None
+
+    async def test_stale_read_skipped(self) -> None:
+        """Payload read before invalidation is not stored"""
+        cache = LocalCache()
+        cache.enable()
+        generation = cache.generation
+        cache.evict(['key'])
+        cache.set('key', b'value', generation)
+        assert cache.get('key') is None
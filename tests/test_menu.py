@@ -13,6 +13,7 @@ from menu_app.menu.menu_router import (
     delete_menu,
     get_menu,
     list_menus,
+    list_menus_with_nested_obj,
     update_menu,
 )
 from menu_app.models import Menu
@@ -79,6 +80,102 @@ class TestListMenu:
             assert MenuReadSchema(**obj)
 
 
+class TestMenuETag:
+    async def test_list_menus_not_modified_success(
+            self,
+            ac: AsyncClient
+    ) -> None:
+        """List menus has ETag, request with matched If-None-Match gets 304 without body"""
+        response = await ac.get(
+            await reverse(list_menus)
+        )
+        assert response.status_code == 200
+        etag = response.headers.get('ETag')
+        assert etag
+        response = await ac.get(
+            await reverse(list_menus),
+            headers={'If-None-Match': etag}
+        )
+        assert response.status_code == 304
+        assert response.headers.get('ETag') == etag
+        assert response.content == b''
+
+    async def test_list_menus_etag_changed_success(
+            self,
+            ac: AsyncClient,
+            get_menu_id: str
+    ) -> None:
+        """Update menu changes ETag of list menus, old ETag gets full response"""
+        response = await ac.get(
+            await reverse(list_menus)
+        )
+        etag = response.headers.get('ETag')
+        response = await ac.patch(
+            await reverse(
+                update_menu,
+                menu_id=get_menu_id
+            ),
+            json={
+                'title': 'etag_string',
+                'description': 'etag_desc'
+            })
+        assert response.status_code == 200
+        response = await ac.get(
+            await reverse(list_menus),
+            headers={'If-None-Match': etag}
+        )
+        assert response.status_code == 200
+        assert response.headers.get('ETag') != etag
+        assert response.json()[0].get('title') == 'etag_string'
+
+    async def test_nested_menus_not_modified_success(
+            self,
+            ac: AsyncClient
+    ) -> None:
+        """Nested menus has ETag, request with matched If-None-Match gets 304 without body"""
+        response = await ac.get(
+            await reverse(list_menus_with_nested_obj)
+        )
+        assert response.status_code == 200
+        etag = response.headers.get('ETag')
+        assert etag
+        response = await ac.get(
+            await reverse(list_menus_with_nested_obj),
+            headers={'If-None-Match': etag}
+        )
+        assert response.status_code == 304
+        assert response.headers.get('ETag') == etag
+        assert response.content == b''
+
+    async def test_nested_menus_etag_changed_success(
+            self,
+            ac: AsyncClient,
+            get_menu_id: str
+    ) -> None:
+        """Update menu changes ETag of nested menus, old ETag gets full response"""
+        response = await ac.get(
+            await reverse(list_menus_with_nested_obj)
+        )
+        etag = response.headers.get('ETag')
+        response = await ac.patch(
+            await reverse(
+                update_menu,
+                menu_id=get_menu_id
+            ),
+            json={
+                'title': 'nested_etag_string',
+                'description': 'nested_etag_desc'
+            })
+        assert response.status_code == 200
+        response = await ac.get(
+            await reverse(list_menus_with_nested_obj),
+            headers={'If-None-Match': etag}
+        )
+        assert response.status_code == 200
+        assert response.headers.get('ETag') != etag
+        assert response.json()[0].get('title') == 'nested_etag_string'
+
+
 class TestGetMenu:
     async def test_get_menu_success(
             self,
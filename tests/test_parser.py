@@ -0,0 +1,62 @@
+"""
+Excel parser tests
+"""
+from celery_app.parser import ExcelParser
+from celery_app.sources import XlsxSource
+
+SHEET_VALUES = [
+    ['1', 'Menu', 'Menu description', '', '', '', ''],
+    ['', '1', 'Submenu', 'Submenu description', '', '', ''],
+    ['', '', '1', 'Dish 1', 'Dish description', '12,50', '10'],
+    ['', '', '2', 'Dish 2', 'Dish description', '13.50', ''],
+    ['2', 'Menu 2', 'Menu description', '', '', '', ''],
+    ['', '1', 'Submenu', 'Submenu description', '', '', ''],
+    ['', '1', 'Submenu copy', 'Submenu description', '', '', ''],
+]
+
+
+class TestExcelParser:
+    async def test_parse_values_stable_ids(self) -> None:
+        """Ids depend only on sheet row numbers and parents"""
+        menus, submenus, dishes, discounts = ExcelParser.parse_values(SHEET_VALUES)
+        assert ExcelParser.parse_values(SHEET_VALUES) == (menus, submenus, dishes, discounts)
+        assert [submenu.get('menu_id') for submenu in submenus] == [menus[0].get('id'), menus[1].get('id'), menus[1].get('id')]
+        assert [dish.get('submenu_id') for dish in dishes] == [submenus[0].get('id')] * 2
+        assert dishes[0].get('price') == '12.50'
+        assert discounts == [{'title': 'Dish 1', 'discount': '10'}, {'title': 'Dish 2', 'discount': ''}]
+
+    async def test_parse_values_unique_ids(self) -> None:
+        """Same row numbers under different parents or repeated give different ids"""
+        menus, submenus, dishes, _ = ExcelParser.parse_values(SHEET_VALUES)
+        ids = [row.get('id') for row in menus + submenus + dishes]
+        assert len(ids) == len(set(ids))
+
+    async def test_parse_values_edited_row_keeps_id(self) -> None:
+        """Changed title keeps id, so sync updates row in place"""
+        edited = [list(row) for row in SHEET_VALUES]
+        edited[2][3] = 'Dish 1 new'
+        _, _, dishes, _ = ExcelParser.parse_values(SHEET_VALUES)
+        _, _, edited_dishes, _ = ExcelParser.parse_values(edited)
+        assert edited_dishes[0].get('id') == dishes[0].get('id')
+        assert edited_dishes[0].get('title') == 'Dish 1 new'
+
+    async def test_fingerprint_success(self) -> None:
+        """Hash changes only with sheet values"""
+        edited = [list(row) for row in SHEET_VALUES]
+        edited[2][6] = '15'
+        assert ExcelParser.fingerprint(SHEET_VALUES) == ExcelParser.fingerprint([list(row) for row in SHEET_VALUES])
+        assert ExcelParser.fingerprint(SHEET_VALUES) != ExcelParser.fingerprint(edited)
+
+    async def test_read_menu_xlsx_success(self) -> None:
+        """Local workbook is parsed with same hash as its rows"""
+        parser = ExcelParser(XlsxSource())
+        sheet_hash, (menus, submenus, dishes, discounts) = parser.read_menu()
+        assert sheet_hash == ExcelParser.fingerprint(XlsxSource().iter_rows())
+        assert menus and submenus and dishes
+        assert len(discounts) == len(dishes)
+        assert all(row.get('price').replace('.', '').isdigit() for row in dishes)
+
+    async def test_read_hash_xlsx_success(self) -> None:
+        """Hash read without parsing is same as hash of parsed read"""
+        parser = ExcelParser(XlsxSource())
+        assert parser.read_hash() == parser.read_menu()[0]
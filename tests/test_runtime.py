@@ -0,0 +1,20 @@
+"""
+Celery worker runtime tests
+"""
+from celery_app import runtime
+from db import database
+
+
+class TestWorkerRuntime:
+    def test_runtime_reuses_loop_and_pools(self) -> None:
+        """Task runs share one loop, engine and redis pool until shutdown"""
+        async def get_pools():
+            return database.get_session_maker(), database.get_redis_pool()
+
+        runtime.start()
+        loop = runtime.get_loop()
+        assert runtime.run(get_pools()) == runtime.run(get_pools())
+        assert runtime.get_loop() is loop
+        runtime.shutdown()
+        assert loop.is_closed()
+        assert database.engine is None and database.redis_pool is None
@@ -0,0 +1,63 @@
+"""
+Single flight tests
+"""
+import asyncio
+
+import pytest
+
+from db.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    async def test_concurrent_calls_coalesced(self) -> None:
+        """Concurrent calls of same key run loader once"""
+        single_flight = SingleFlight()
+        calls = []
+
+        async def loader() -> list[int]:
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return [1, 2]
+
+        results = await asyncio.gather(*(single_flight.do('key', loader) for _ in range(10)))
+        assert len(calls) == 1
+        assert results == [[1, 2]] * 10
+
+    async def test_error_shared_and_not_cached(self) -> None:
+        """Loader error raised for all waiters, next call runs loader again"""
+        single_flight = SingleFlight()
+
+        async def failed_loader() -> None:
+            await asyncio.sleep(0.01)
+            raise ValueError('failed')
+
+        results = await asyncio.gather(
+            *(single_flight.do('key', failed_loader) for _ in range(3)),
+            return_exceptions=True
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+
+        async def loader() -> str:
+            return 'value'
+
+        assert await single_flight.do('key', loader) == 'value'
+
+    async def test_cancelled_leader_waiter_loads(self) -> None:
+        """Waiter runs loader itself if leader cancelled"""
+        single_flight = SingleFlight()
+
+        async def slow_loader() -> str:
+            await asyncio.sleep(10)
+            return 'slow'
+
+        async def loader() -> str:
+            return 'value'
+
+        leader = asyncio.create_task(single_flight.do('key', slow_loader))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(single_flight.do('key', loader))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert await waiter == 'value'
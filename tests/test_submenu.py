@@ -174,18 +174,16 @@ class TestUpdateSubmenu:
         assert response.status_code == 404
         assert response.json().get('detail') == 'submenu not found'
 
-    async def test_exists_title_patch_menu_success(
+    async def test_exists_title_create_submenu_failed(
             self,
             ac: AsyncClient,
-            get_menu_id: str,
-            get_submenu_id: str
+            get_menu_id: str
     ) -> None:
-        """Check 404 for update menu"""
-        response = await ac.patch(
+        """Check 400 for create submenu with title of other submenu"""
+        response = await ac.post(
             await reverse(
-                update_submenu,
-                menu_id=get_menu_id,
-                submenu_id=get_submenu_id
+                create_submenu,
+                menu_id=get_menu_id
             ),
             json={
                 'title': 'new_string',
@@ -0,0 +1,61 @@
+"""
+Sync diff engine tests
+"""
+from celery_app.sync_diff import SUBMENU_FIELDS, diff_menu_objects, diff_table
+from celery_app.update_db import SyncInvalidation
+
+
+class TestSyncDiff:
+    async def test_diff_table_success(self) -> None:
+        """Rows are matched by id, not by position"""
+        db_rows = [
+            {'id': '1', 'title': 'a', 'description': 'a', 'menu_id': 'm'},
+            {'id': '2', 'title': 'b', 'description': 'b', 'menu_id': 'm'},
+            {'id': '3', 'title': 'c', 'description': 'c', 'menu_id': 'm'},
+        ]
+        excel_rows = [
+            {'id': '4', 'title': 'd', 'description': 'd', 'menu_id': 'm'},
+            {'id': '3', 'title': 'c', 'description': 'c', 'menu_id': 'm'},
+            {'id': '1', 'title': 'a', 'description': 'new', 'menu_id': 'm'},
+        ]
+        diff = diff_table(db_rows, excel_rows, SUBMENU_FIELDS)
+        assert [row.get('id') for row in diff.insert] == ['4']
+        assert [row.get('id') for row in diff.update] == ['1']
+        assert diff.delete == ['2']
+
+    async def test_diff_table_empty(self) -> None:
+        """Equal rows give empty diff"""
+        rows = [{'id': '1', 'title': 'a', 'description': 'a', 'menu_id': 'm'}]
+        assert not diff_table(rows, [dict(row) for row in rows], SUBMENU_FIELDS)
+
+    async def test_invalidation_scopes_success(self) -> None:
+        """Only scopes of changed entities and their parents are bumped, moved rows change both parents"""
+        menus = [
+            {'id': 'm1', 'title': 'm1', 'description': 'm'},
+            {'id': 'm2', 'title': 'm2', 'description': 'm'},
+            {'id': 'm3', 'title': 'm3', 'description': 'm'},
+        ]
+        submenus = [
+            {'id': 's1', 'title': 's1', 'description': 's', 'menu_id': 'm1'},
+            {'id': 's2', 'title': 's2', 'description': 's', 'menu_id': 'm2'},
+            {'id': 's3', 'title': 's3', 'description': 's', 'menu_id': 'm3'},
+        ]
+        db_dishes = [
+            {'id': 'd1', 'title': 'd1', 'description': 'd', 'price': '1.00', 'submenu_id': 's1'},
+            {'id': 'd2', 'title': 'd2', 'description': 'd', 'price': '1.00', 'submenu_id': 's1'},
+            {'id': 'd3', 'title': 'd3', 'description': 'd', 'price': '1.00', 'submenu_id': 's3'},
+        ]
+        excel_dishes = [dict(db_dishes[0]), dict(db_dishes[1], submenu_id='s2'), dict(db_dishes[2])]
+        invalidation = SyncInvalidation(None)
+        invalidation.add_parents((menus, submenus, db_dishes), (menus, submenus, excel_dishes))
+        invalidation.add_diff(diff_menu_objects((menus, submenus, db_dishes), (menus, submenus, excel_dishes)))
+        assert invalidation.scopes == {'menu_m1', 'menu_m2', 'submenu_s1', 'submenu_s2'}
+
+    async def test_invalidation_unchanged(self) -> None:
+        """Sync without changes bumps nothing"""
+        invalidation = SyncInvalidation(None)
+        invalidation.add_diff(diff_menu_objects(([], [], []), ([], [], [])))
+        invalidation.add_pricing([])
+        invalidation.add_counters([], [])
+        assert not invalidation.scopes
+        assert await invalidation.invalidate() == 0
@@ -0,0 +1,30 @@
+"""
+Sync telemetry tests
+"""
+from celery_app.parser import ExcelParser
+from celery_app.sources import XlsxSource
+from celery_app.telemetry import SyncTelemetry
+
+
+class TestSyncTelemetry:
+    async def test_phases_success(self) -> None:
+        """Phases are summed and rows pass through unchanged"""
+        telemetry = SyncTelemetry()
+        with telemetry.phase('diff'):
+            pass
+        with telemetry.phase('diff'):
+            pass
+        assert list(telemetry.timed_rows(iter([[1], [2]]), 'fetch')) == [[1], [2]]
+        telemetry.count(dishes=2)
+        record = telemetry.finish('applied')
+        assert record.get('status') == 'applied'
+        assert set(record.get('phases')) == {'diff', 'fetch'}
+        assert record.get('counts') == {'dishes': 2}
+        assert record.get('duration_ms') >= 0
+
+    async def test_read_menu_phases_success(self) -> None:
+        """Reading sheet records fetch and parse phases"""
+        telemetry = SyncTelemetry()
+        ExcelParser(XlsxSource()).read_menu(telemetry)
+        assert {'fetch', 'parse'} <= set(telemetry.phases)
+        assert telemetry.phases.get('parse') >= 0
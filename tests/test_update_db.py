@@ -0,0 +1,121 @@
+"""
+Sync update base tests
+"""
+from conftest import async_session_maker
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from celery_app.parser import ExcelParser
+from celery_app.sources import XlsxSource
+from celery_app.telemetry import SyncTelemetry
+from celery_app.update_db import SYNC_LOCK_KEY, run_update_base
+from menu_app.models import Dish, Menu, Submenu
+
+SHEET_VALUES = [
+    ['1', 'Menu 1', 'Menu description', '', '', '', ''],
+    ['', '1', 'Submenu 1', 'Submenu description', '', '', ''],
+    ['', '', '1', 'Dish 1', 'Dish description', '12,50', '10'],
+    ['', '', '2', 'Dish 2', 'Dish description', '13.50', ''],
+    ['2', 'Menu 2', 'Menu description', '', '', '', ''],
+    ['', '1', 'Submenu 2', 'Submenu description', '', '', ''],
+    ['', '', '1', 'Dish 3', 'Dish description', '10.00', ''],
+]
+
+EDITED_VALUES = [
+    ['1', 'Menu 1', 'Menu description', '', '', '', ''],
+    ['', '1', 'Submenu 1', 'Submenu description', '', '', ''],
+    ['', '', '1', 'Dish 1 new', 'Dish description', '12,50', '10'],
+    ['2', 'Menu 2', 'Menu description new', '', '', '', ''],
+    ['', '1', 'Submenu 2', 'Submenu description', '', '', ''],
+    ['', '', '1', 'Dish 3', 'Dish description', '10.00', ''],
+    ['', '2', 'Submenu 3', 'Submenu description', '', '', ''],
+]
+
+
+async def sync_values(
+        values: list[list[str]],
+        telemetry: SyncTelemetry | None = None
+) -> int | None:
+    """Parse sheet values and run sync of them"""
+    parse_menu, parse_submenu, parse_dish, discount_index = await ExcelParser(XlsxSource()).build_menu(
+        ExcelParser.parse_values(values)
+    )
+    return await run_update_base(parse_menu, parse_submenu, parse_dish, discount_index, telemetry)
+
+
+class TestRunUpdateBase:
+    async def test_initial_load_success(
+            self,
+            sync_database: None,
+            get_async_session: AsyncSession
+    ) -> None:
+        """Empty tables are loaded with pricing and counters, cache versions of loaded menus are bumped"""
+        telemetry = SyncTelemetry()
+        assert await sync_values(SHEET_VALUES, telemetry)
+        assert telemetry.counts.get('menus_insert') == 2
+        assert telemetry.counts.get('submenus_insert') == 2
+        assert telemetry.counts.get('dishes_insert') == 3
+        menu = (await get_async_session.execute(select(Menu).where(Menu.title == 'Menu 1'))).scalar_one()
+        assert menu.submenus_count == 1
+        assert menu.dishes_count == 2
+        dish = (await get_async_session.execute(select(Dish).where(Dish.title == 'Dish 1'))).scalar_one()
+        assert dish.discount == '10%'
+        assert dish.discounted_price == '11.25'
+
+    async def test_edited_sheet_success(
+            self,
+            sync_database: None,
+            get_async_session: AsyncSession
+    ) -> None:
+        """Only changed rows are inserted, updated and deleted, unchanged rows keep ids"""
+        await sync_values(SHEET_VALUES)
+        unchanged = (await get_async_session.execute(
+            select(Submenu.id, Submenu.title).order_by(Submenu.title)
+        )).all()
+        dish_id = (await get_async_session.execute(select(Dish.id).where(Dish.title == 'Dish 1'))).scalar_one()
+
+        telemetry = SyncTelemetry()
+        assert await sync_values(EDITED_VALUES, telemetry)
+        diff_counts = {
+            key: value for key, value in telemetry.counts.items() if key.endswith(('_insert', '_update', '_delete'))
+        }
+        assert diff_counts == {
+            'menus_insert': 0,
+            'menus_update': 1,
+            'menus_delete': 0,
+            'submenus_insert': 1,
+            'submenus_update': 0,
+            'submenus_delete': 0,
+            'dishes_insert': 0,
+            'dishes_update': 1,
+            'dishes_delete': 1,
+        }
+        submenus = (await get_async_session.execute(
+            select(Submenu.id, Submenu.title).order_by(Submenu.title)
+        )).all()
+        assert submenus[:2] == unchanged
+        assert submenus[2].title == 'Submenu 3'
+        dishes = (await get_async_session.execute(select(Dish.id, Dish.title).order_by(Dish.title))).all()
+        assert [dish.title for dish in dishes] == ['Dish 1 new', 'Dish 3']
+        assert dishes[0].id == dish_id
+        menu = (await get_async_session.execute(select(Menu).where(Menu.title == 'Menu 1'))).scalar_one()
+        assert menu.dishes_count == 1
+
+    async def test_unchanged_sheet_success(
+            self,
+            sync_database: None
+    ) -> None:
+        """Second run of same sheet changes nothing and bumps no cache versions"""
+        await sync_values(SHEET_VALUES)
+        assert await sync_values(SHEET_VALUES) == 0
+
+    async def test_locked_success(
+            self,
+            sync_database: None
+    ) -> None:
+        """Run exits without changes while other sync holds the lock"""
+        async with async_session_maker() as session:
+            await session.execute(select(func.pg_advisory_xact_lock(SYNC_LOCK_KEY)))
+            assert await sync_values(SHEET_VALUES) is None
+        async with async_session_maker() as session:
+            assert (await session.execute(select(func.count(Menu.id)))).scalar() == 0